@@ -7,8 +7,8 @@ from pytest import Session
 from app.crud.account import change_password, is_reset_code_expired, reset_password, set_member_status, validate_user, validate_new_registered_user, register_user
 from app.db.session import get_db
 from app.schemas.account import Login, Register, NewRegisteredUser, User
-from jose import JWTError, jwt
-from app.core.config import settings
+from app.auth.revocation import token_revocations
+from app.auth.tokens import TokenError, token_service
 from app.utils.jwt import create_access_token
 
 router = APIRouter(prefix="/account", tags=["Account"])
@@ -58,11 +58,13 @@ def loginNewRegisteredUser(data: NewRegisteredUser, db: Session=Depends(get_db))
 def refreshLogin(refresh_token: str = Query(..., description="JWT refresh token to refresh.")):
     try:
         # Decode token to get user identity
-        payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = token_service.decode(refresh_token)
         email = payload.get("sub")
 
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid refresh token")
+        if token_revocations.is_revoked(email, payload.get("iat")):
+            raise HTTPException(status_code=401, detail="Refresh token has been revoked")
 
         # Create a new access token
         token_data = create_access_token({"sub": email})
@@ -70,7 +72,7 @@ def refreshLogin(refresh_token: str = Query(..., description="JWT refresh token
             "access_token": token_data["access_token"],
             "expired_date": token_data["expire_date"]
         }
-    except JWTError as e:
+    except TokenError as e:
         raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
 
 #------------------------------------register a user-----------------------------------------------
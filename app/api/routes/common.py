@@ -1,13 +1,17 @@
 # app/api/routes/common.py - social networking app common related endpoints
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pytest import Session
-from app.auth.dependencies import get_current_user
-from app.crud.common import get_ads, get_recent_news, get_schools_by_state, get_sports, get_states
-from app.db.session import get_db
+from app.auth.dependencies import get_current_user, require_service_token
+from app.core.config import settings
+from app.crud.common import ReferenceDataset, get_reference_dataset, get_school_index, invalidate_reference_data, search_schools
+from app.crud.email_outbox import email_outbox
+from app.db.pool import pool_metrics
+from app.db.session import async_engine, async_replicas, engine, get_db, replicas
 import logging
 from app.schemas.common import Ads, RecentNews, Schools, Sports, States
+from app.utils.http_cache import cached_json_response, conditional_json_response, etag_for, serialize_json
 
 router = APIRouter(prefix="/common", tags=["Common"])
 
@@ -21,12 +25,14 @@ logging.basicConfig(level=logging.ERROR)
     summary="Gets the list of states",
     description="This endpoint helps gets the list of states."
 )
-def states(db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+def states(request: Request, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
     try:
-        st = get_states(db)
-        if not st:
+        st = get_reference_dataset("states", db)
+        if not st.value:
             raise HTTPException(status_code=404, detail="States not found.")
-        return st
+        return cached_json_response(request, st, "states", st.value)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -47,12 +53,14 @@ def log_error(message: str = Query(...), stack: str = Query(...)):
     summary="Gets the list of sports",
     description="This endpoint gets the list of sports."
 )
-def sports(db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
+def sports(request: Request, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
     try:
-        sp = get_sports(db)
-        if not sp:
+        sp = get_reference_dataset("sports", db)
+        if not sp.value:
             raise HTTPException(status_code=404, detail="Sports not found.")
-        return sp
+        return cached_json_response(request, sp, "sports", sp.value)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -60,19 +68,31 @@ def sports(db: Session = Depends(get_db), current_user: str = Depends(get_curren
 
 @router.get("/schools",response_model=List[Schools],
     summary="Gets the list of schools",
-    description="This endpoint gets the list of schools given a state and school type such as college high school, etc."
+    description="This endpoint gets the list of schools given a state and school type such as college high school, etc. Pass prefix to get only the first matches for a typeahead."
 )
 def schools(
+    request: Request,
     state: str = Query(..., description="State abbreviation"),
     institutionType: str = Query(..., description="Type of institution"),
+    prefix: Optional[str] = Query(None, description="Only schools whose name, or a word in it, starts with this text"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of matches returned for a prefix"),
     db: Session = Depends(get_db), 
     current_user: str = Depends(get_current_user)
 ):
     try: 
-        sc = get_schools_by_state(db, state, institutionType)
-        if not sc:
+        if prefix:
+            sc = search_schools(db, state, institutionType, prefix, limit)
+            if not sc:
+                raise HTTPException(status_code=404, detail="No schools found.")
+            body = serialize_json(sc)
+            return conditional_json_response(request, body, etag_for(body))
+
+        sc = get_school_index(db, state, institutionType)
+        if not sc or not len(sc.value):
             raise HTTPException(status_code=404, detail="No schools found.")
-        return sc
+        return cached_json_response(request, sc, "all", sc.value.all())
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -83,15 +103,19 @@ def schools(
     description="This endpoint returns the list of ads depending on type."
 )
 def ads(
+    request: Request,
     type: str = Query(..., description="the type of ads"),
     db: Session = Depends(get_db), 
     current_user: str = Depends(get_current_user)
 ):
     try:
-        ad = get_ads(db, type)
-        if not ad:
+        ad = get_reference_dataset("ads", db)
+        ads_of_type = ad.value.get(type, [])
+        if not ads_of_type:
             raise HTTPException(status_code=404, detail="No ads found.")
-        return ad
+        return cached_json_response(request, ad, f"ads:{type}", ads_of_type)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -101,13 +125,60 @@ def ads(
     summary="Gets the list of recent news.",
     description="This endpoint gets the list of recent news."
 )
-def news(db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
+def news(request: Request, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
     try:
-        rn = get_recent_news(db)
-        if not rn:
+        rn = get_reference_dataset("news", db)
+        if not rn.value:
             raise HTTPException(status_code=404, detail="News not found.")
-        return rn
+        return cached_json_response(request, rn, "news", rn.value)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+#--------------------------------------reload cached reference data---------------------------------------------
+
+@router.post("/cache/invalidate",
+    summary="Reloads cached reference data.",
+    description="This endpoint drops the cached states, sports, ads, news and school lists (or only the given dataset) so they are reloaded from the database. Only the instance that receives the call is affected, other instances reload when their cache expires (REFERENCE_CACHE_TTL_SECONDS). Requires the service token (SERVICE_TOKEN setting) instead of a member token."
+)
+def invalidate_cache(
+    dataset: Optional[ReferenceDataset] = Query(None, description="states, sports, ads, news or schools; all datasets when omitted"),
+    _: None = Depends(require_service_token)
+):
+    try:
+        invalidate_reference_data(dataset)
+        return {"message": "Reference data cache invalidated successfully."}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+#--------------------------------------database connection pool metrics---------------------------------------------
+
+@router.get("/pool-metrics",
+    summary="Gets the database connection pool metrics.",
+    description="This endpoint returns the size, checked-out and overflow connections and the connection wait times of the sync and async database pools (primary and read replicas) of this instance."
+)
+def pool_metrics_info(current_user: str = Depends(get_current_user)):
+    try:
+        return {
+            "sync": pool_metrics(engine.pool),
+            "async": pool_metrics(async_engine.pool),
+            "replicas": [
+                {"sync": pool_metrics(sync_replica.pool), "async": pool_metrics(async_replica.pool)}
+                for sync_replica, async_replica in zip(replicas.engines, async_replicas.engines)
+            ]
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+#--------------------------------------send queued emails---------------------------------------------
 
+@router.get("/email-outbox/drain",
+    summary="Sends the queued emails.",
+    description="This endpoint sends the due emails of the email outbox (registration, password reset) and returns how many were processed. Called by the Vercel cron job (vercel.json) with the service token (SERVICE_TOKEN / CRON_SECRET) as bearer token."
+)
+def drain_email_outbox(_: None = Depends(require_service_token)):
+    try:
+        return {"processed": email_outbox.drain(max_batches=settings.EMAIL_OUTBOX_DRAIN_MAX_BATCHES)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -6,7 +6,7 @@ from pytest import Session
 
 from app.auth.dependencies import get_current_user
 from app.crud.contact import get_member_contacts, get_member_requests, get_member_suggestions, get_people_iam_following, get_search_contacts, get_search_results, get_searched_member_contacts, get_whose_following_me, set_accept_request, set_delete_contact, set_follow_member, set_reject_request, set_send_request, set_unfollow_member
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.schemas.contact import MemberContacts, Search
 
 router = APIRouter(prefix="/contact", tags=["Contact"])
@@ -17,12 +17,14 @@ router = APIRouter(prefix="/contact", tags=["Contact"])
     summary="returns list of contacts by search text",
     description="This endpoint returns the list of contacts given a search text."
 )
-def search_results(db: Session = Depends(get_db),current_user: str = Depends(get_current_user), member_id:int = Query(...), search_text:str  = Query(...)):
+def search_results(db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user), member_id:int = Query(...), search_text:str  = Query(...)):
     try:
         st = get_search_results(db, member_id, search_text)
         if not st:
             raise HTTPException(status_code=404, detail="Search results not found.")
         return st
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -32,12 +34,14 @@ def search_results(db: Session = Depends(get_db),current_user: str = Depends(get
     summary="returns list of people i follow.",
     description="This endpoint returns a list of site members i follow."
 )
-def people_iam_following(db: Session = Depends(get_db),current_user: str = Depends(get_current_user), member_id:int = Query(...)):
+def people_iam_following(db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user), member_id:int = Query(...)):
     try:
         result = get_people_iam_following(db, member_id)
         if not result:
             raise HTTPException(status_code=404, detail="No followed members found.")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -47,12 +51,14 @@ def people_iam_following(db: Session = Depends(get_db),current_user: str = Depen
     summary="returns list of people following me.",
     description="This endpoint returns a list of members following me."
 )
-def whose_following_me(db: Session = Depends(get_db),current_user: str = Depends(get_current_user), member_id:int = Query(...)):
+def whose_following_me(db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user), member_id:int = Query(...)):
     try:
         result = get_whose_following_me(db, member_id)
         if not result:
             raise HTTPException(status_code=404, detail="No members following me found.")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -111,12 +117,14 @@ def send_request(db: Session = Depends(get_db),
     summary="returns list of them member's contacts.",
     description="This endpoint returns a list of the member's contacts."
 )
-def contacts(db: Session = Depends(get_db),current_user: str = Depends(get_current_user), member_id:int = Query(...)):
+def contacts(db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user), member_id:int = Query(...)):
     try:
         result = get_member_contacts(db, member_id)
         if not result:
             raise HTTPException(status_code=404, detail="No member's contacts found.")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -126,7 +134,7 @@ def contacts(db: Session = Depends(get_db),current_user: str = Depends(get_curre
     summary="returns list of the member's searched contacts.",
     description="This endpoint returns a list of the member's searched contacts base on givent text."
 )
-def search_member_contacts(db: Session = Depends(get_db),
+def search_member_contacts(db: Session = Depends(get_read_db),
              current_user: str = Depends(get_current_user), 
              member_id:int = Query(...),
              search_text:str = Query(...)):
@@ -135,6 +143,8 @@ def search_member_contacts(db: Session = Depends(get_db),
         if not result:
             raise HTTPException(status_code=404, detail="No member's contacts found.")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -192,12 +202,14 @@ def reject_request(db: Session = Depends(get_db),
     summary="returns list of member's contact requests.",
     description="This endpoint returns a list of the member's contact requests."
 )
-def requests(db: Session = Depends(get_db),current_user: str = Depends(get_current_user), member_id:int = Query(...)):
+def requests(db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user), member_id:int = Query(...)):
     try:
         result = get_member_requests(db, member_id)
         if not result:
             raise HTTPException(status_code=404, detail="No contacts found.")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -207,7 +219,7 @@ def requests(db: Session = Depends(get_db),current_user: str = Depends(get_curre
     summary="returns list of contacts given a user id and search text.",
     description="This endpoint returns a list of contacts given a user id and search text."
 )
-def search_contacts(db: Session = Depends(get_db),
+def search_contacts(db: Session = Depends(get_read_db),
                     current_user: str = Depends(get_current_user), 
                     user_id:int = Query(...),
                     search_text:str = Query(...)
@@ -217,10 +229,13 @@ def search_contacts(db: Session = Depends(get_db),
         if not result:
             raise HTTPException(status_code=404, detail="No contacts found.")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 #-------------------------------------suggestions listing----------------------------------------------
+# primary: sp_get_member_suggestions is committed after the call, it is not known to be read-only
 
 @router.get("/suggestions",response_model=List[MemberContacts],
     summary="returns list of contacts suggested for a member .",
@@ -232,5 +247,7 @@ def suggestions(db: Session = Depends(get_db),current_user: str = Depends(get_cu
         if not result:
             raise HTTPException(status_code=404, detail="No contacts found.")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
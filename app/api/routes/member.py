@@ -1,43 +1,61 @@
 # app/api/routes/member.py  - social networking app member related endpoints
 
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
-from pytest import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.dependencies import get_current_user
-from app.crud.member import add_member_school, check_is_following_contact, check_is_friend_by_contact_id, create_member_post, create_member_post_response, get_instagram_url, get_member_contact_info, get_member_education_info, get_member_general_info, get_recent_post_responses, get_recent_posts, get_videos_list, get_youtube_channel, get_youtube_playlist, set_increment_post_like_counter, set_instagram_url, set_member_contact_info, set_member_general_info, set_remove_school, set_youtube_channel, update_member_school
-from app.db.session import get_db
-from app.schemas.member import ContactInfo, EducationInfo, GeneralInfo, PostResponses, Posts, YoutubeChannel, YoutubePlayList, YoutubeVideos, InstagramURL
+from app.crud.member import add_member_school, check_is_following_contact, check_is_friend_by_contact_id, create_member_post, create_member_post_response, get_member_profile, get_member_profile_section, get_recent_post_responses, get_recent_posts, get_videos_list, get_youtube_playlist, set_increment_post_like_counter, set_instagram_url, set_member_contact_info, set_member_general_info, set_remove_school, set_youtube_channel, update_member_school
+from app.db.session import get_async_db, get_async_read_db
+from app.utils.cursor import decode_cursor
+from app.schemas.member import ContactInfo, EducationInfo, GeneralInfo, MemberProfile, PostResponsesPage, PostsPage, YoutubeChannel, YoutubePlayList, YoutubeVideos, InstagramURL
 
 router = APIRouter(prefix="/member", tags=["Member"])
 
 #------------------------------- member posts list----------------------------------------------------
 
-@router.get("/posts/{member_id}",response_model=List[Posts],
+@router.get("/posts/{member_id}",response_model=PostsPage,
     summary="Gets the list of recent posts.",
-    description="This endpoint returns the list of member's recent posts listing."
+    description="This endpoint returns a page of the member's recent posts listing. Pass the returned next_cursor back as cursor to get the next page. Set include_comments to embed each post's latest comments."
 )
-def recent_posts(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def recent_posts(member_id:int, db: AsyncSession = Depends(get_async_read_db),current_user: str = Depends(get_current_user),
+                 limit: int = Query(50, ge=1, le=100, description="Number of posts per page."),
+                 cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page."),
+                 include_comments: int = Query(0, ge=0, le=10, description="Embed the latest N comments of every post (0 = none).")):
     try:
-        pst = get_recent_posts(member_id, db)
-        if not pst:
+        seek = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        pst = await get_recent_posts(member_id, db, limit, seek, include_comments)
+        if not pst.posts and not cursor:
             raise HTTPException(status_code=404, detail="Posts not found.")
         return pst
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 #-----------------------------------post response list------------------------------------------------
 
-@router.get("/post-responses/{post_id}",response_model=List[PostResponses],
+@router.get("/post-responses/{post_id}",response_model=PostResponsesPage,
     summary="Gets the list of recent posts responses.",
-    description="This endpoint returns the list of member's recent post responses listing."
+    description="This endpoint returns a page of the post's recent responses, newest first. Pass the returned next_cursor back as cursor to get the next page."
 )
-def recent_post_respponses(post_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def recent_post_respponses(post_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user),
+                           limit: int = Query(20, ge=1, le=100, description="Number of responses per page."),
+                           cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page.")):
     try:
-        resp = get_recent_post_responses(db, post_id)
-        if not resp:
+        seek = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        resp = await get_recent_post_responses(db, post_id, limit, seek)
+        if not resp.post_responses and not cursor:
             raise HTTPException(status_code=404, detail="Posts not found.")
         return resp
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -47,9 +65,9 @@ def recent_post_respponses(post_id:int, db: Session = Depends(get_db),current_us
     summary="incremenet post like counter for post ID.",
     description="This endpoint increments post like counter for post ID."
 )
-def increment_post_like_counter(post_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def increment_post_like_counter(post_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user)):
     try:
-        set_increment_post_like_counter(db, post_id)
+        await set_increment_post_like_counter(db, post_id)
         return {"message" : "incremented post like counter successfully."} 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -60,12 +78,14 @@ def increment_post_like_counter(post_id:int, db: Session = Depends(get_db),curre
     summary="Creates post for member ID.",
     description="This endpoint creates a post for member ID."
 )
-def create_post(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user), post_msg:str=Query(...)):
+async def create_post(member_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user), post_msg:str=Query(...)):
     try:
-        result = create_member_post(member_id, db,  post_msg)
+        result = await create_member_post(member_id, db,  post_msg)
         if not result:
             raise HTTPException(status_code=404, detail="Post not found.")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -75,27 +95,48 @@ def create_post(member_id:int, db: Session = Depends(get_db),current_user: str =
     summary="Creates post response for member ID.",
     description="This endpoint creates a post response for member ID and post ID."
 )
-def create_post_response(member_id:int, post_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user), post_msg:str=Query(...)):
+async def create_post_response(member_id:int, post_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user), post_msg:str=Query(...)):
     try:
-        result = create_member_post_response(db, member_id, post_id, post_msg)
+        result = await create_member_post_response(db, member_id, post_id, post_msg)
         if not result:
             raise HTTPException(status_code=404, detail="Post response not found.")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+#--------------------------------------get whole member profile ---------------------------------------------
+
+@router.get("/profile/{member_id}",response_model=MemberProfile,
+    summary="Gets the whole member profile.",
+    description="This endpoint returns the member's general, contact and education info, youtube channel and instagram url in one response. Pass viewer_id to also get whether that member is a contact of / follows the member."
+)
+async def member_profile(member_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user),
+                   viewer_id: Optional[int] = Query(None, description="Member viewing the profile, for the is_friend / is_following flags.")):
+    try:
+        return await get_member_profile(db, member_id, viewer_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 #--------------------------------------get member general info ---------------------------------------------
 
 @router.get("/general-info/{member_id}",response_model=GeneralInfo,
     summary="Gets the member profile general info.",
     description="This endpoint returns the member's profile general information."
 )
-def member_general_info(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def member_general_info(member_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user)):
     try:
-        resp = get_member_general_info(db, member_id)
+        resp = await get_member_profile_section(db, member_id, "general_info")
         if not resp:
             raise HTTPException(status_code=404, detail="General info not found.")
         return resp
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -105,12 +146,16 @@ def member_general_info(member_id:int, db: Session = Depends(get_db),current_use
     summary="Gets the member contact info.",
     description="This endpoint returns the member's contact information."
 )
-def member_contact_info(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def member_contact_info(member_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user)):
     try:
-        resp = get_member_contact_info(db, member_id)
+        resp = await get_member_profile_section(db, member_id, "contact_info")
         if not resp:
             raise HTTPException(status_code=404, detail="Contact info not found.")
         return resp
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -120,12 +165,16 @@ def member_contact_info(member_id:int, db: Session = Depends(get_db),current_use
     summary="Gets the member education info.",
     description="This endpoint returns the list of member's education information."
 )
-def member_education_info(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def member_education_info(member_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user)):
     try:
-        resp = get_member_education_info(db, member_id)
+        resp = await get_member_profile_section(db, member_id, "education_info")
         if not resp:
             raise HTTPException(status_code=404, detail="Education info not found.")
         return resp
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -135,12 +184,14 @@ def member_education_info(member_id:int, db: Session = Depends(get_db),current_u
     summary="Gets u tube vidoe playlist",
     description="This endpoint returns the list of u tube video playlist."
 )
-def youtube_playlist(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def youtube_playlist(member_id:int, db: AsyncSession = Depends(get_async_read_db),current_user: str = Depends(get_current_user)):
     try:
-        resp = get_youtube_playlist(member_id, db)
+        resp = await get_youtube_playlist(member_id, db)
         if not resp:
             raise HTTPException(status_code=404, detail="playlist not found.")
         return resp
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))   
      
@@ -150,12 +201,14 @@ def youtube_playlist(member_id:int, db: Session = Depends(get_db),current_user:
     summary="Gets the video list for a playerlist id.",
     description="This endpoint returns the list of youtube videos for a playerlist id."
 )
-def youtube_videos(playlist_id:str, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def youtube_videos(playlist_id:str, db: AsyncSession = Depends(get_async_read_db),current_user: str = Depends(get_current_user)):
     try:
-        resp = get_videos_list(playlist_id)
+        resp = await get_videos_list(playlist_id)
         if not resp:
             raise HTTPException(status_code=404, detail="youtuve playerlist not found.")
         return resp
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -165,9 +218,9 @@ def youtube_videos(playlist_id:str, db: Session = Depends(get_db),current_user:
     summary="checks if member is a contact by contact id.",
     description="This endpoint returns a bool to check to see if member is a contact by contact id."
 )
-def is_friend_by_contact_id(member_id, contact_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def is_friend_by_contact_id(member_id, contact_id:int, db: AsyncSession = Depends(get_async_read_db),current_user: str = Depends(get_current_user)):
     try:
-        resp = check_is_friend_by_contact_id(db, member_id, contact_id)
+        resp = await check_is_friend_by_contact_id(db, member_id, contact_id)
         return resp
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -178,9 +231,9 @@ def is_friend_by_contact_id(member_id, contact_id:int, db: Session = Depends(get
     summary="checks if member is following contact id.",
     description="This endpoint returns a bool to check to see if member is following contact id."
 )
-def is_following_contact(member_id, contact_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def is_following_contact(member_id, contact_id:int, db: AsyncSession = Depends(get_async_read_db),current_user: str = Depends(get_current_user)):
     try:
-        resp = check_is_following_contact(db, member_id, contact_id)
+        resp = await check_is_following_contact(db, member_id, contact_id)
         return resp
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))    
@@ -191,12 +244,12 @@ def is_following_contact(member_id, contact_id:int, db: Session = Depends(get_db
     summary="Saves or update the member general info.",
     description="This endpoint saves or update the member general information."
 )
-def saves_member_general_info(
+async def saves_member_general_info(
     data: GeneralInfo = Body(...), 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: str = Depends(get_current_user)):
      try:
-         set_member_general_info(db, data)
+         await set_member_general_info(db, data)
          return {"message": "Saves general info successfully."}
      except Exception as e:
          raise HTTPException(status_code=500, detail=str(e))
@@ -207,9 +260,9 @@ def saves_member_general_info(
     summary="Saves or update the member contact info.",
     description="This endpoint saves or update the member contact information."
 )
-def saves_member_contact_info(db: Session = Depends(get_db),current_user: str = Depends(get_current_user), data: ContactInfo = Body(...)):
+async def saves_member_contact_info(db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user), data: ContactInfo = Body(...)):
     try:
-        set_member_contact_info(db, data)
+        await set_member_contact_info(db, data)
         return {"message": "Saves contact info successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -220,12 +273,16 @@ def saves_member_contact_info(db: Session = Depends(get_db),current_user: str =
     summary="Gets instagram url for the member id.",
     description="This endpoint returns the instagram url for the member id."
 )
-def instagram_url(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def instagram_url(member_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user)):
     try:
-        resp = get_instagram_url(db, member_id)
+        resp = await get_member_profile_section(db, member_id, "instagram_url")
         if not resp:
             raise HTTPException(status_code=404, detail="Instagram url not found.")
         return resp
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))    
 
@@ -235,9 +292,9 @@ def instagram_url(member_id:int, db: Session = Depends(get_db),current_user: str
     summary="Saves or update the member instagram url.",
     description="This endpoint saves or update the member instagram url."
 )
-def saves_instagram_url(data: InstagramURL = Body(...), db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def saves_instagram_url(data: InstagramURL = Body(...), db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user)):
     try:
-        set_instagram_url(db, data)
+        await set_instagram_url(db, data)
         return {"message": "Saves instagram url successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))    
@@ -248,12 +305,16 @@ def saves_instagram_url(data: InstagramURL = Body(...), db: Session = Depends(ge
     summary="Gets the youtube channel id for the member id.",
     description="This endpoint returns the youtube channel id for the member id."
 )
-def youtube_channel(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+async def youtube_channel(member_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user)):
     try:
-        resp = get_youtube_channel(db, member_id)
+        resp = await get_member_profile_section(db, member_id, "youtube_channel")
         if not resp:
             raise HTTPException(status_code=404, detail="Youtube channel id not found.")
         return resp
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))    
 
@@ -263,9 +324,9 @@ def youtube_channel(member_id:int, db: Session = Depends(get_db),current_user: s
     summary="Saves or update the member youtube channel id.",
     description="This endpoint saves or update the youtube channel id."
 )
-def saves_youtube_channel(db: Session = Depends(get_db),current_user: str = Depends(get_current_user), data: YoutubeChannel = Body(...)):
+async def saves_youtube_channel(db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user), data: YoutubeChannel = Body(...)):
     try:
-        set_youtube_channel(db, data)
+        await set_youtube_channel(db, data)
         return {"message": "Saves youtube channel successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))   
@@ -276,9 +337,9 @@ def saves_youtube_channel(db: Session = Depends(get_db),current_user: str = Depe
     summary="Add a school to list of schools for the member id.",
     description="This endpoint adds a school to list of schools for the member id."
 )
-def add_school(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user), data: EducationInfo = Body(...)):
+async def add_school(member_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user), data: EducationInfo = Body(...)):
     try:
-        add_member_school(member_id, db, data)
+        await add_member_school(member_id, db, data)
         return {"message": "Added school successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
@@ -289,9 +350,9 @@ def add_school(member_id:int, db: Session = Depends(get_db),current_user: str =
     summary="Update school info for the member id.",
     description="This endpoint updates school info for the member id."
 )
-def update_school(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user), data: EducationInfo = Body(...)):
+async def update_school(member_id:int, db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user), data: EducationInfo = Body(...)):
     try:
-        update_member_school(member_id, db, data)
+        await update_member_school(member_id, db, data)
         return {"message": "Updated school successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
@@ -302,9 +363,9 @@ def update_school(member_id:int, db: Session = Depends(get_db),current_user: str
     summary="Removes a school for the member id.",
     description="This endpoint removes a school for the member id."
 )
-def remove_school(db: Session = Depends(get_db),current_user: str = Depends(get_current_user),  member_id: int = Query(...), inst_id: int = Query(...), inst_type: int = Query(...)):
+async def remove_school(db: AsyncSession = Depends(get_async_db),current_user: str = Depends(get_current_user),  member_id: int = Query(...), inst_id: int = Query(...), inst_type: int = Query(...)):
     try:
-        set_remove_school(db, member_id, inst_id, inst_type)
+        await set_remove_school(db, member_id, inst_id, inst_type)
         return {"message": "Removed school successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))   
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
 from pytest import Session
 from app.auth.dependencies import get_current_user
 from app.crud.message import get_message_info, get_messages, get_searched_messages, get_total_unread_messages, set_delete_message, set_send_message, set_toggle_message_state
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.schemas.message import MessageInfo, SearchMessages
 
 router = APIRouter(prefix="/message", tags=["Message"])
@@ -16,12 +16,14 @@ router = APIRouter(prefix="/message", tags=["Message"])
     summary="Returns list of member's messages.",
     description="This endpoint returns the list of messages given a member id."
 )
-def search_results(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user),type:str  = Query(...), show_type:str  = Query(...)):
+def search_results(member_id:int, db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user),type:str  = Query(...), show_type:str  = Query(...)):
     try:
         st = get_messages(db, member_id, type, show_type)
         if not st:
             raise HTTPException(status_code=404, detail="Messages not found.")
         return st
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -79,16 +81,19 @@ def delete_message(message_id:int, db: Session = Depends(get_db),
     summary="Gets the total unread messages.",
     description="This endpoint returns the total number of unread messages."
 )
-def total_unread_messages(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+def total_unread_messages(member_id:int, db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user)):
     try:
         total = get_total_unread_messages(member_id, db )
         if not total:
             raise HTTPException(status_code=404, detail="total unread messages count not found.")
         return total
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 #---------------------------------------returns msg info for a msg id--------------------------------------------
+# primary: sp_get_message_info_by_id is not known to be read-only
 
 @router.get("/message-info/{message_id}",response_model=MessageInfo,
     summary="Returns a message info.",
@@ -100,6 +105,8 @@ def message_info(message_id:int, db: Session = Depends(get_db),current_user: str
         if not msginfo:
             raise HTTPException(status_code=404, detail="Message info not found.")
         return msginfo
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -109,11 +116,13 @@ def message_info(message_id:int, db: Session = Depends(get_db),current_user: str
     summary="Returns list of member's searched messages.",
     description="This endpoint returns the list of member's searched messages."
 )
-def search_results(member_id: int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user), search_key:str  = Query(...)):
+def search_results(member_id: int, db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user), search_key:str  = Query(...)):
     try:
         sm = get_searched_messages(member_id, db, search_key)
         if not sm:
             raise HTTPException(status_code=404, detail="Searched messages not found.")
         return sm
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -6,7 +6,8 @@ from fastapi.responses import JSONResponse
 from pytest import Session
 from app.auth.dependencies import get_current_user
 from app.crud.setting import get_name_info, get_notifications, get_profile_settings, privacy_search_settings, set_deactivate_account, set_privacy_search_settings, set_profile_settings, set_security_question, set_update_email_info, set_update_name_info, set_update_notifications, set_update_password_info
-from app.db.session import get_db
+from app.crud.member import invalidate_member_profile
+from app.db.session import get_db, get_read_db
 from app.schemas.setting import MemberNameInfo, NotificationsSetting, PrivacySearchSettings
 
 router = APIRouter(prefix="/setting", tags=["Setting"])
@@ -19,12 +20,14 @@ UPLOAD_FOLDER = "images/members"
     summary="Get the member name info.",
     description="This endpoint returns the name of the member name information."
 )
-def name_info(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+def name_info(member_id:int, db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user)):
     try:
         name_info = get_name_info(member_id, db)
         if not name_info:
             raise HTTPException(status_code=404, detail="Name info not found.")
         return name_info
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -34,12 +37,14 @@ def name_info(member_id:int, db: Session = Depends(get_db),current_user: str = D
     summary="Get the member notifications.",
     description="This endpoint returns the member notifications."
 )
-def notifications(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+def notifications(member_id:int, db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user)):
     try:
         notifications = get_notifications(member_id, db)
         if not notifications:
             raise HTTPException(status_code=404, detail="Notifications not found.")
         return notifications
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -150,12 +155,14 @@ def deactivate_account(member_id:int, db: Session = Depends(get_db),
     summary="Get the member profile settings.",
     description="This endpoint returns the members profile settings."
 )
-def profile_settings(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+def profile_settings(member_id:int, db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user)):
     try:
         psetting = get_profile_settings(member_id, db)
         if not psetting:
             raise HTTPException(status_code=404, detail="profile settings not found.")
         return psetting
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -178,12 +185,14 @@ def save_profile_settings(member_id:int,body: PrivacySearchSettings, db: Session
     summary="Get the member privacy search settings.",
     description="This endpoint returns the members privacy search settings."
 )
-def profile_search_settings(member_id:int, db: Session = Depends(get_db),current_user: str = Depends(get_current_user)):
+def profile_search_settings(member_id:int, db: Session = Depends(get_read_db),current_user: str = Depends(get_current_user)):
     try:
         psetting = privacy_search_settings(member_id, db)
         if not psetting:
             raise HTTPException(status_code=404, detail="Privacy search settings not found.")
         return psetting
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -231,7 +240,10 @@ async def upload_profile_photo(
 
         with open(save_path, "wb") as buffer:
             shutil.copyfileobj(image.file, buffer)
+        invalidate_member_profile(int(member_id))
 
         return JSONResponse(status_code=200, content={"message": "File uploaded successfully."})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
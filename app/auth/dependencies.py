@@ -1,11 +1,21 @@
 # app/auth/dependencies.py
 
+import hashlib
+import hmac
+import time
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordBearer
+from app.auth.revocation import token_revocations
+from app.auth.tokens import TokenError, token_service
 from app.core.config import settings
+from app.utils.cache import LRUCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/account/login")
+service_scheme = HTTPBearer(auto_error=False)
+
+# Verified claims keyed by the token's sha256 digest, kept until the token's exp.
+# Repeated requests with the same token skip the signature check.
+token_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
@@ -13,11 +23,33 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        try:
+            payload = token_service.decode(token)
+        except TokenError:
             raise credentials_exception
-        return email
-    except JWTError:
+        expires_in = payload.get("exp", 0) - time.time()
+        if expires_in > 0:  # tokens without exp are verified every time
+            token_cache.set(key, payload, ttl=expires_in)
+
+    email: str = payload.get("sub")
+    if email is None:
         raise credentials_exception
+    # checked on every request, cached claims included: a Bloom filter lookup unless the subject was revoked
+    if token_revocations.is_revoked(email, payload.get("iat")):
+        raise credentials_exception
+    return email
+
+def require_service_token(credentials: HTTPAuthorizationCredentials = Depends(service_scheme)):
+    # Operational endpoints (cache invalidation, scheduled jobs) take the SERVICE_TOKEN setting as
+    # bearer token instead of a member's JWT, so no member account can call them.
+    if not settings.SERVICE_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Service endpoints are disabled")
+    if credentials is None or not hmac.compare_digest(credentials.credentials.encode(), settings.SERVICE_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid service token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
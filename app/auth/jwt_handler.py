@@ -1,17 +1,19 @@
 #app/auth/jwt_handler.py
 
 from datetime import datetime, timedelta
-from jose import jwt
+from app.auth.tokens import token_service
 from app.core.config import settings
 
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    now = datetime.utcnow()
+    expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now})
+    return token_service.encode(to_encode)
 
 def create_refresh_token(data: dict):
-    expire = datetime.utcnow() + timedelta(days=7)
+    now = datetime.utcnow()
+    expire = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode = data.copy()
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
\ No newline at end of file
+    to_encode.update({"exp": expire, "iat": now})
+    return token_service.encode(to_encode)
\ No newline at end of file
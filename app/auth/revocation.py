@@ -0,0 +1,185 @@
+# app/auth/revocation.py
+# Token revocation store. Tokens stay stateless JWTs, a revocation is a row in
+# tbtokenrevocations (app/db/sql/007_token_revocations.sql) that invalidates every token of a
+# subject (the sub claim, the member's email) issued at or before revoked_at:
+    # * Every revoked subject is kept in an in-process Bloom filter, so get_current_user answers
+    #   "not revoked" for almost every request without a database round trip
+    # * Bloom filter hits are confirmed with one indexed query, the answer is cached per subject
+    # * A background thread loads rows added by other API instances incrementally. revoked_at and
+    #   revocation_id are set at INSERT, but rows become visible at COMMIT, so each refresh re-reads
+    #   the last REVOCATION_REFRESH_OVERLAP_SECONDS before the newest row seen and skips known ids
+    # * Only revocations newer than the longest token lifetime (access or refresh, from the settings)
+    #   are loaded, older ones can't match a live token
+# Tokens without an iat claim (issued before iat was added) are treated as revoked when their subject is.
+# iat is whole seconds from the API instance's clock, revoked_at comes from the database clock, so both
+# are compared as whole seconds and a token issued in the second of the revocation counts as revoked.
+# Clock skew between the two shifts the cut-off by the skew: a login within that many seconds after a
+# revocation can be refused (log in again), a token issued that long before it can stay valid.
+# Deactivation (status 3) signs a member out of every session, it does not lock the account:
+# validate_user still accepts status 3 so the member can log in again and reactivate, and tokens
+# issued by that login (iat after revoked_at) are valid.
+
+import logging
+import threading
+from typing import Callable, Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.utils.bloom import BloomFilter
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def revocation_window_seconds() -> int:
+    # A revocation matters as long as a token issued before it can still be unexpired.
+    return max(settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+
+#-----------------------------------------------------------------------------------
+
+INSERT_REVOCATION_SQL = """
+    INSERT INTO public.tbtokenrevocations (subject) VALUES (:subject)
+"""
+
+# rows revoked after :since (epoch, overlapping the previous refresh), within the window
+LOAD_REVOCATIONS_SQL = """
+    SELECT revocation_id, subject, extract(epoch FROM revoked_at) AS revoked_at
+    FROM public.tbtokenrevocations
+    WHERE revoked_at > greatest(to_timestamp(:since), now() - make_interval(secs => :window_seconds))
+    ORDER BY revoked_at
+"""
+
+LAST_REVOCATION_SQL = """
+    SELECT extract(epoch FROM max(revoked_at))
+    FROM public.tbtokenrevocations
+    WHERE subject = :subject
+"""
+
+
+class TokenRevocations:
+
+    def __init__(self, session_factory: Callable[[], Session], capacity: int, error_rate: float,
+                 refresh_interval: float, refresh_overlap: float, confirm_cache_size: int, window_seconds: int):
+        self._session_factory = session_factory
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._refresh_interval = refresh_interval
+        self._refresh_overlap = refresh_overlap
+        self._window_seconds = window_seconds
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._newest = 0.0                      # newest revoked_at loaded (epoch, database clock)
+        self._loaded: Dict[int, float] = {}     # revocation_id -> revoked_at of the rows inside the overlap
+        self._confirmed = LRUCache(maxsize=confirm_cache_size)   # subject -> last revoked_at (epoch), 0.0 if none
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    #-----------------------------------------------------------------------------------
+
+    def is_revoked(self, subject: str, issued_at: Optional[float]) -> bool:
+        if not self._bloom.might_contain(subject):
+            return False
+
+        revoked_at = self._confirmed.get(subject)
+        if revoked_at is None:
+            generation = self._confirmed.generation()
+            db = self._session_factory()
+            try:
+                revoked_at = db.execute(text(LAST_REVOCATION_SQL), {"subject": subject}).scalar() or 0.0
+            finally:
+                db.close()
+            revoked_at = float(revoked_at)
+            self._confirmed.set(subject, revoked_at, generation=generation)   # not if revoked again meanwhile
+
+        if not revoked_at:
+            return False   # Bloom filter false positive
+        return issued_at is None or int(issued_at) <= int(revoked_at)   # whole seconds on both sides
+
+    #-----------------------------------------------------------------------------------
+
+    def revoke(self, db: Session, subject: str) -> None:
+        # Adds the revocation row to the caller's transaction, call remember(subject) once committed.
+        db.execute(text(INSERT_REVOCATION_SQL), {"subject": subject})
+
+    def remember(self, subject: str) -> None:
+        # Makes a committed revocation effective in this process right away,
+        # other instances pick it up on their next refresh.
+        self._bloom.add(subject)
+        self._confirmed.pop(subject)
+
+    #-----------------------------------------------------------------------------------
+
+    def refresh(self) -> int:
+        # Loads revocations committed since the last refresh. Returns the number of new rows.
+        # When the filter holds more subjects than it was sized for, a larger one is built from
+        # the whole window and swapped in, so checks keep using the old filter meanwhile.
+        with self._refresh_lock:
+            bloom, newest, loaded = self._bloom, self._newest, self._loaded
+            if bloom.is_full():
+                self._capacity *= 2
+                bloom, newest, loaded = BloomFilter(self._capacity, self._error_rate), 0.0, {}
+
+            since = newest - self._refresh_overlap if newest else 0.0
+            db = self._session_factory()
+            try:
+                rows = db.execute(text(LOAD_REVOCATIONS_SQL), {
+                    "since": since,
+                    "window_seconds": self._window_seconds
+                }).all()
+            except Exception as e:
+                logger.error(f"Failed to load token revocations: {e}")
+                return 0
+            finally:
+                db.close()
+
+            added = 0
+            loaded = {revocation_id: revoked_at for revocation_id, revoked_at in loaded.items() if revoked_at > since}
+            for revocation_id, subject, revoked_at in rows:
+                if revocation_id in loaded:
+                    continue
+                bloom.add(subject)
+                self._confirmed.pop(subject)
+                loaded[revocation_id] = float(revoked_at)
+                newest = max(newest, float(revoked_at))
+                added += 1
+            self._bloom, self._newest, self._loaded = bloom, newest, loaded
+            return added
+
+    #-----------------------------------------------------------------------------------
+
+    def start(self) -> None:
+        # Loads the current revocations, then starts the background thread that
+        # refreshes them every refresh_interval seconds.
+        if self._worker is not None:
+            return
+        self.refresh()
+        self._stopping.clear()
+        self._worker = threading.Thread(target=self._run, name="token-revocation-refresh", daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        if self._worker is not None:
+            self._stopping.set()
+            self._wake.set()
+            self._worker.join()
+            self._worker = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self._refresh_interval)
+            self._wake.clear()
+            if not self._stopping.is_set():
+                self.refresh()
+
+
+token_revocations = TokenRevocations(
+    SessionLocal,
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+    refresh_interval=settings.REVOCATION_REFRESH_SECONDS,
+    refresh_overlap=settings.REVOCATION_REFRESH_OVERLAP_SECONDS,
+    confirm_cache_size=settings.REVOCATION_CONFIRM_CACHE_SIZE,
+    window_seconds=revocation_window_seconds()
+)
@@ -0,0 +1,182 @@
+# app/auth/tokens.py
+# Single token service used to issue and verify every JWT of the application:
+    # * TokenService.encode(claims) / decode(token), raising TokenError for any invalid or expired token
+    # * Pluggable signing backends, selected with the JWT_BACKEND setting:
+    #   - "jose"  - python-jose (the original implementation)
+    #   - "pyjwt" - PyJWT
+    #   - "hmac"  - hand-rolled HS256 (hmac + hashlib from the standard library), the fast path
+    # * All backends produce and accept standard compact JWS tokens, so tokens issued by one verify with the others.
+# Compare the backends with: python -m app.tools.bench_jwt
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Type
+from app.core.config import settings
+
+
+class TokenError(Exception):
+    # Invalid signature, malformed token, wrong algorithm or expired token
+    pass
+
+
+def to_timestamp(value: Any) -> Any:
+    # Numeric date claims (exp, iat, nbf) as seconds since the epoch, naive datetimes are UTC
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return value
+
+#-----------------------------------------------------------------------------------
+
+class JoseBackend:
+
+    name = "jose"
+
+    def __init__(self, secret_key: str, algorithm: str):
+        from jose import jwt, JWTError
+        self._jwt = jwt
+        self._error = JWTError
+        self._key = secret_key
+        self._algorithm = algorithm
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return self._jwt.encode(claims, self._key, algorithm=self._algorithm)
+
+    def encode_expiring(self, claims: Dict[str, Any], expires: List[int]) -> List[str]:
+        return [self.encode({**claims, "exp": exp}) for exp in expires]
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(token, self._key, algorithms=[self._algorithm])
+        except self._error as e:
+            raise TokenError(str(e))
+
+
+class PyJWTBackend:
+
+    name = "pyjwt"
+
+    def __init__(self, secret_key: str, algorithm: str):
+        import jwt
+        self._jwt = jwt
+        self._key = secret_key
+        self._algorithm = algorithm
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return self._jwt.encode(claims, self._key, algorithm=self._algorithm)
+
+    def encode_expiring(self, claims: Dict[str, Any], expires: List[int]) -> List[str]:
+        return [self.encode({**claims, "exp": exp}) for exp in expires]
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            # like jose, sub is not required to be a string and aud is not checked
+            return self._jwt.decode(token, self._key, algorithms=[self._algorithm],
+                                    options={"verify_sub": False, "verify_aud": False})
+        except self._jwt.InvalidTokenError as e:
+            raise TokenError(str(e))
+
+
+class HmacBackend:
+    # HS256 only. The header is encoded once and the HMAC key schedule is computed once, each
+    # signature then copies the keyed HMAC state and hashes header.payload.
+
+    name = "hmac"
+
+    def __init__(self, secret_key: str, algorithm: str):
+        if algorithm != "HS256":
+            raise ValueError(f"The hmac JWT backend only supports HS256, not {algorithm}")
+        self._mac = hmac.new(secret_key.encode(), digestmod=hashlib.sha256)
+        self._header = self._b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+    @staticmethod
+    def _b64encode(data: bytes) -> bytes:
+        return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+    @staticmethod
+    def _b64decode(data: bytes) -> bytes:
+        return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return self._b64encode(mac.digest())
+
+    def _encode_payload(self, payload: bytes) -> str:
+        signing_input = self._header + b"." + self._b64encode(payload)
+        return (signing_input + b"." + self._sign(signing_input)).decode()
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return self._encode_payload(json.dumps(claims, separators=(",", ":")).encode())
+
+    def encode_expiring(self, claims: Dict[str, Any], expires: List[int]) -> List[str]:
+        # serializes the shared claims once and appends each exp to the JSON object
+        shared = json.dumps({name: value for name, value in claims.items() if name != "exp"}, separators=(",", ":")).encode()
+        prefix = shared[:-1] + b"," if len(shared) > 2 else b"{"
+        return [self._encode_payload(prefix + b'"exp":' + str(int(exp)).encode() + b"}") for exp in expires]
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            signing_input, _, signature = token.encode().rpartition(b".")
+            header, _, payload = signing_input.partition(b".")
+            if not header or not payload or not signature:
+                raise TokenError("Not enough segments")
+            if not hmac.compare_digest(self._sign(signing_input), signature):
+                raise TokenError("Signature verification failed")
+            if json.loads(self._b64decode(header)).get("alg") != "HS256":
+                raise TokenError("The specified alg value is not allowed")
+            claims = json.loads(self._b64decode(payload))
+        except (ValueError, TypeError, AttributeError) as e:   # bad base64 / JSON / non-object header
+            raise TokenError(f"Invalid token: {e}")
+
+        if not isinstance(claims, dict):
+            raise TokenError("Invalid payload")
+        now = time.time()
+        exp = claims.get("exp")
+        if exp is not None:
+            if not isinstance(exp, (int, float)):
+                raise TokenError("Expiration Time claim (exp) must be a number")
+            if exp <= now:
+                raise TokenError("Signature has expired")
+        nbf = claims.get("nbf")
+        if nbf is not None:
+            if not isinstance(nbf, (int, float)):
+                raise TokenError("Not Before claim (nbf) must be a number")
+            if nbf > now:
+                raise TokenError("The token is not yet valid (nbf)")
+        return claims
+
+
+TOKEN_BACKENDS: Dict[str, Type] = {
+    backend.name: backend for backend in (JoseBackend, PyJWTBackend, HmacBackend)
+}
+
+#-----------------------------------------------------------------------------------
+
+class TokenService:
+
+    def __init__(self, backend: str, secret_key: str, algorithm: str):
+        if backend not in TOKEN_BACKENDS:
+            raise ValueError(f"Unknown JWT backend {backend}, expected one of {', '.join(TOKEN_BACKENDS)}")
+        self.backend = TOKEN_BACKENDS[backend](secret_key, algorithm)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return self.backend.encode({name: to_timestamp(value) for name, value in claims.items()})
+
+    def encode_expiring(self, claims: Dict[str, Any], expires: List[Any]) -> List[str]:
+        # One token per exp, all with the same other claims (e.g. an access and refresh token pair)
+        return self.backend.encode_expiring(
+            {name: to_timestamp(value) for name, value in claims.items()},
+            [to_timestamp(exp) for exp in expires]
+        )
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        return self.backend.decode(token)
+
+
+token_service = TokenService(settings.JWT_BACKEND, settings.SECRET_KEY, settings.ALGORITHM)
@@ -1,12 +1,44 @@
 # app/core/config.py
 
+from typing import Optional
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str  # Your SQLAlchemy-compatible connection string
+    ASYNC_DATABASE_URL: Optional[str] = None    # asyncpg URL for the async routes, derived from DATABASE_URL when unset
+
+    # connection pools. Each engine has its own pool, so an instance opens up to
+    # (ASYNC_DB_POOL_SIZE + ASYNC_DB_MAX_OVERFLOW) + (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    # to the primary, and as many to each read replica.
+    ASYNC_DB_POOL_SIZE: int = 5                 # async engine: member feed / profile routes (the bulk of the traffic)
+    ASYNC_DB_MAX_OVERFLOW: int = 10             # extra connections opened under load, closed when returned
+    DB_POOL_SIZE: int = 2                       # sync engine: the other routes, background workers and tools
+    DB_MAX_OVERFLOW: int = 8                    # sync routes are capped by the 40 threadpool slots anyway
+    DB_POOL_TIMEOUT: float = 30.0               # both engines: seconds to wait for a connection before failing
+    DB_POOL_RECYCLE: int = 1800                 # seconds before a connection is replaced (-1 = never)
+    DB_POOL_PRE_PING: bool = True               # test connections on checkout, drops ones closed by the server
+
+    # read replicas for the GET endpoints (get_read_db / get_async_read_db)
+    DATABASE_REPLICA_URLS: str = ""             # comma separated, empty = every read goes to DATABASE_URL
+    REPLICA_RETRY_SECONDS: float = 30.0         # how long a replica that failed to connect is skipped
+    READ_YOUR_WRITES_SECONDS: float = 5.0       # reads of a member who just wrote go to the primary for this long
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_CACHE_SIZE: int = 10000               # verified tokens kept by get_current_user
+    JWT_BACKEND: str = "jose"                   # jose, pyjwt or hmac (HS256 only), see app/auth/tokens.py
+    # bearer token of the operational endpoints (cache invalidation, ...), unset = those endpoints are disabled.
+    # Also read from CRON_SECRET, the token Vercel cron jobs send.
+    SERVICE_TOKEN: Optional[str] = Field(None, validation_alias=AliasChoices("SERVICE_TOKEN", "CRON_SECRET"))
+
+    # token revocations (app/auth/revocation.py)
+    REVOCATION_FILTER_CAPACITY: int = 100000    # revoked subjects before the Bloom filter is rebuilt larger
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001 # share of requests that need a database check to confirm
+    REVOCATION_REFRESH_SECONDS: float = 15.0    # how often revocations from other instances are loaded
+    REVOCATION_REFRESH_OVERLAP_SECONDS: float = 300.0  # re-read window for rows committed late (longer than any transaction)
+    REVOCATION_CONFIRM_CACHE_SIZE: int = 10000  # confirmed Bloom filter hits kept per subject
     ENCRYPTION_KEY: str
     YOUTUBE_API_KEY: str
 
@@ -15,10 +47,43 @@ class Settings(BaseSettings):
     APP_SMTP_HOST: str
     APP_SMTP_PORT: int = 587
     APP_SMTP_PWD: str
+    APP_SMTP_TIMEOUT_SECONDS: float = 30.0
     COMPLETE_REGISTRATION_LINK: str
     APP_NAME: str
     WEBSITE_LINK: str
 
+    # email outbox (app/crud/email_outbox.py)
+    EMAIL_OUTBOX_WORKER_ENABLED: bool = True    # False when python -m app.tools.outbox_worker drains it instead
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0      # due retries are picked up within this time
+    EMAIL_OUTBOX_DRAIN_MAX_BATCHES: int = 2     # per call of GET /api/common/email-outbox/drain, fits the function time limit
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20           # emails sent per SMTP connection
+    EMAIL_OUTBOX_LEASE_SECONDS: float = 900.0   # a dead worker's claimed emails are retried after this (> batch size x SMTP timeout)
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8          # then the email is marked failed
+    EMAIL_RETRY_BASE_SECONDS: float = 30.0      # retry n waits base * 2^(n-1) seconds
+    EMAIL_RETRY_MAX_SECONDS: float = 3600.0
+
+    # member feed timeline (fan-out-on-write)
+    TIMELINE_MAX_LENGTH: int = 800              # rows kept per member timeline
+    TIMELINE_READ_FANOUT_THRESHOLD: int = 2000  # members with more contacts build their feed on read, authors with more followers aren't fanned out
+
+    # write-behind like counter (app/crud/like_buffer.py)
+    LIKE_BUFFER_ENABLED: bool = False           # True only on long-running servers, False writes every like through
+    LIKE_FLUSH_INTERVAL_SECONDS: float = 2.0
+    LIKE_FLUSH_THRESHOLD: int = 200             # buffered likes that trigger an early flush
+
+    # comment thread pages cache (get_recent_post_responses)
+    COMMENT_CACHE_SIZE: int = 1000              # posts whose thread pages are kept
+    COMMENT_CACHE_TTL_SECONDS: float = 60.0
+
+    # member profile documents cache (get_member_profile_document)
+    PROFILE_CACHE_SIZE: int = 10000             # members whose profile document is kept
+    PROFILE_CACHE_TTL_SECONDS: float = 300.0
+
+    # reference data cache for states, sports, ads and news (app/crud/common.py)
+    REFERENCE_CACHE_TTL_SECONDS: float = 3600.0
+    REFERENCE_CACHE_CONTROL: str = "private, max-age=300"  # the endpoints require a member token, so browsers only, no shared caches
+    SCHOOL_INDEX_PRELOAD: bool = True           # build every state's school index at startup
+
 
     class Config:
         env_file = ".env"
@@ -10,14 +10,15 @@ from datetime import datetime
 from fastapi import HTTPException
 from pydantic import EmailStr
 from sqlalchemy import text
+from app.auth.revocation import token_revocations
+from app.crud.email_outbox import email_outbox
 from app.db.models.sp_db_models import Tbforgotpwdcodes, Tbmemberprofile, Tbmembers, Tbmembersregistered
 from app.schemas.account import CodeAndNameForgotPwdModel, NewRegisteredUser, Register, User
 from app.utils.crypto import encrypt
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 import logging
-from app.utils.email import send_email
-from app.utils.jwt import create_access_token, create_refresh_token
+from app.utils.jwt import issue_token_pair
 from app.core.config import settings 
 from sqlalchemy.orm import aliased
 
@@ -26,7 +27,9 @@ def validate_user(db: Session, email: str, password: str) -> User | None:
     Validates an existing user's credentials.
     - Encrypts the provided password.
     - Queries the database to match user with active status (2 or 3).
-    - If match is found, returns user info with access and refresh tokens.
+      Deactivated members (3) can still log in: logging in again is how they reactivate, the client
+      gets current_status. Deactivation only revokes the tokens issued before it (app/auth/revocation.py).
+    - If match is found, returns user info with the access and refresh token pair.
     - If not found, returns a blank user model with ID 0.
     """
     try:
@@ -61,13 +64,7 @@ def validate_user(db: Session, email: str, password: str) -> User | None:
 
         m, p = query
 
-        token_data = create_access_token({"sub": email})
-        access_token = token_data["access_token"]
-        expire_str = token_data["expire_date"]
-
-        refresh_data = create_refresh_token({"sub": email})
-        refresh_token = refresh_data["refresh_token"]
-        refresh_expire_str = refresh_data["expire_date"]
+        tokens = issue_token_pair({"sub": email})
 
         return User( 
             member_id=str(p.member_id),
@@ -76,10 +73,10 @@ def validate_user(db: Session, email: str, password: str) -> User | None:
             picture_path=p.picture_path or "",
             title=p.title_desc or "",
             current_status=str(m.status or "0"),
-            access_token=access_token,
-            expired_date=expire_str,
-            refresh_token=refresh_token,
-            refresh_expire_date=refresh_expire_str
+            access_token=tokens["access_token"],
+            expired_date=tokens["expire_date"],
+            refresh_token=tokens["refresh_token"],
+            refresh_expire_date=tokens["refresh_expire_date"]
         )
 
     except SQLAlchemyError as e:
@@ -95,13 +92,13 @@ def validate_new_registered_user(db: Session, data:NewRegisteredUser) -> User |
     """
     Validates a newly registered user by checking:
     - If the email and registration code match a pending (status 1) user.
-    - If valid, updates status to active (2), generates access & refresh tokens.
+    - If valid, updates status to active (2), generates the access & refresh token pair.
     - Returns the full user model if successful, otherwise None.
     """
     try:
         Profile = aliased(Tbmemberprofile)
         query = (
-            db.query(Tbmembers, Tbmemberprofile,Tbmembersregistered)
+            db.query(Tbmembers, Profile, Tbmembersregistered)
             .join(Profile, Tbmembers.member_id == Profile.member_id)
             .join(Tbmembersregistered, Tbmembers.member_id == Tbmembersregistered.member_id)
             .filter(
@@ -119,13 +116,7 @@ def validate_new_registered_user(db: Session, data:NewRegisteredUser) -> User |
         m.status = 2 #update to active
         db.commit()
 
-        token_data = create_access_token({"sub": data.email})
-        access_token = token_data["access_token"]
-        expire_str = token_data["expire_date"]
-
-        refresh_data = create_refresh_token({"sub": data.email})
-        refresh_token = refresh_data["refresh_token"]
-        refresh_expire_str = refresh_data["expire_date"]
+        tokens = issue_token_pair({"sub": data.email})
 
         return User(
             member_id=str(m.member_id),
@@ -134,10 +125,10 @@ def validate_new_registered_user(db: Session, data:NewRegisteredUser) -> User |
             picture_path=p.picture_path or "",
             title=p.title_desc or "",
             current_status=str(m.status or "0"),
-            access_token=access_token,
-            expired_date=expire_str,
-            refresh_token=refresh_token,
-            refresh_expire_date=refresh_expire_str
+            access_token=tokens["access_token"],
+            expired_date=tokens["expire_date"],
+            refresh_token=tokens["refresh_token"],
+            refresh_expire_date=tokens["refresh_expire_date"]
         )
 
     except SQLAlchemyError as e:
@@ -155,7 +146,7 @@ def register_user(db: Session, user: Register) -> str | None:
     - Checks if the email is already in use.
     - Encrypts the password.
     - Calls stored procedure to create the user (via create_new_user).
-    - Sends a confirmation email with a registration code and link.
+    - Queues a confirmation email with a registration code and link (sent by the email outbox worker).
     - Returns "NewEmail" if successful, "ExistingEmail" if email exists.
     """
     try:
@@ -176,13 +167,12 @@ def register_user(db: Session, user: Register) -> str | None:
         if not code:
          raise HTTPException(status_code=500, detail="User creation failed")
 
-        db.commit()
-        from_email = settings.APP_FROM_EMAIL
         to_email = user.email
         full_name = user.first_name + " " + user.last_name
         subject = "Account confirmation"
         body = generate_html_email_body(user.email,full_name, code, user.first_name,"web")
-        send_email("", from_email, to_email, subject, body, True)
+        email_outbox.enqueue(db, "", to_email, subject, body, True)
+        db.commit()  # the new user and the confirmation email together
         return "NewEmail"
 
     except SQLAlchemyError as e:
@@ -283,8 +273,8 @@ def reset_password(db: Session, email: str) -> str:
     Handles password reset process.
     - Checks if a user with the given email exists.
     - If yes, creates a new reset code and saves it in the DB.
-    - Sends an email with the reset code and instructions.
-    - Returns 'success' if email sent, otherwise 'fail'.
+    - Queues an email with the reset code and instructions (sent by the email outbox worker).
+    - Returns 'success' if the email was queued, otherwise 'fail'.
     """
     result_list = []
     # Avoid duplicate joins by using the relationship
@@ -304,8 +294,7 @@ def reset_password(db: Session, email: str) -> str:
             status=0
         )
         db.add(new_code)
-        db.commit()
-        db.refresh(new_code)
+        db.flush()  # assigns code_id, committed below together with the queued email
 
         result_list.append(CodeAndNameForgotPwdModel(
             code_id=str(new_code.code_id),
@@ -322,14 +311,14 @@ def reset_password(db: Session, email: str) -> str:
         code = ds.code_id
         first_name = ds.first_name
 
-        from_email = settings.APP_FROM_EMAIL
         to_email = email
         subject = "Password Reset confirmation"
         website_link = settings.WEBSITE_LINK
         app_name = settings.APP_NAME
         body = html_body_text(email, first_name, code, app_name, website_link)
 
-        send_email(first_name, from_email, to_email, subject, body, True)
+        email_outbox.enqueue(db, first_name, to_email, subject, body, True)
+        db.commit()
         return "success"
     else:
         return "fail"
@@ -426,11 +415,17 @@ def set_member_status(db: Session, member_id: int, status: int) -> None:
     """
     Updates a member's status (e.g., activate, deactivate, etc.).
     - Commits the change if the user is found.
+    - Any status other than active revokes the member's issued tokens.
     """
     member = db.query(Tbmembers).filter(Tbmembers.member_id == member_id).first()
     if member:
         member.status = status
-        db.commit()    
+        revoke = status != 2 and member.email is not None
+        if revoke:
+            token_revocations.revoke(db, member.email)
+        db.commit()
+        if revoke:
+            token_revocations.remember(member.email)    
 
 
 
@@ -6,34 +6,55 @@
     # * Retrieving recent news for the application.
     # * These functions are simple and efficient, focused on read-only access to common/shared data across the app (often public-facing or used in forms).
 
-from typing import List
+from typing import Dict, List, Literal, Optional, Tuple
 from pytest import Session
 from sqlalchemy import text
-from app.core.config import Settings
-from app.db.models.sp_db_models import Tbads, Tbcolleges, Tbprivateschools, Tbrecentnews, Tbsports, Tbstates, t_tbpublicschools
+from app.core.config import Settings, settings
+from app.db.models.sp_db_models import Tbads, Tbrecentnews, Tbsports, Tbstates, t_school_dim
+from app.db.session import SessionLocal
 from app.schemas.common import Ads, RecentNews, Schools, Sports, States
+from app.utils.cache import CachedDataset, ReferenceCache
+from app.utils.prefix_index import PrefixIndex
+
+# States, sports, ads and news almost never change. They are loaded once (at startup, see
+# warm_reference_data) and served from memory; after REFERENCE_CACHE_TTL_SECONDS they are
+# reloaded in the background, or right away through invalidate_reference_data.
+reference_cache = ReferenceCache(SessionLocal, ttl=settings.REFERENCE_CACHE_TTL_SECONDS)
 
 #------------------------------------------------------------------------------------
 def get_states(db: Session) -> List[States]:
     """
-    Retrieves a list of U.S. states from the database.
+    Retrieves a list of U.S. states from the reference data cache.
     - Returns the list ordered alphabetically by state name.
     - Used to populate dropdowns or filters.
     """
-    return db.query(Tbstates).order_by(Tbstates.name.asc()).all()
+    return reference_cache.get("states", db)
+
+def load_states(db: Session) -> List[States]:
+    rows = db.query(Tbstates).order_by(Tbstates.name.asc()).all()
+    return [States.model_validate(row, from_attributes=True) for row in rows]
 
 #-----------------------------------------------------------------------------------
 
 def get_sports(db: Session) -> List[Sports]:
     """
-    Retrieves all sports from the database.
+    Retrieves all sports from the reference data cache.
     - Returns them ordered alphabetically by name.
     - Typically used to show sport options in filters, forms, etc.
     """
-    return db.query(Tbsports).order_by(Tbsports.name.asc()).all()
+    return reference_cache.get("sports", db)
+
+def load_sports(db: Session) -> List[Sports]:
+    rows = db.query(Tbsports).order_by(Tbsports.name.asc()).all()
+    return [Sports.model_validate(row, from_attributes=True) for row in rows]
 
 #-----------------------------------------------------------------------------------
 
+# "1" = public (tbpublicschools), "2" = private (tbprivateschools), "3" = colleges (tbcolleges).
+# The lists read the school_dim materialized view, one (school_type, school_id) row per school
+# with just the columns the app needs, instead of branching over the three wide school tables.
+SCHOOL_TYPES = ("1", "2", "3")
+
 def get_schools_by_state(db:Session, state: str, institution_type:str) -> List[Schools]:
     """
     Fetches a list of schools in a given state, filtered by institution type:
@@ -44,79 +65,144 @@ def get_schools_by_state(db:Session, state: str, institution_type:str) -> List[S
     Returns a standardized list of Schools (school_id, school_name).
     Used in school selectors, filtering users by location/education, etc.
     """
-    results = []
-    if institution_type == "1":  # Public
-        query = (
-            db.query(t_tbpublicschools)
-            .filter(t_tbpublicschools.state == state)
-            .order_by(t_tbpublicschools.school_name.asc())
-            .distinct()
-            .all()
-        )
-        results = [
-            Schools(
-                school_id=str(s.lgid),
-                SchoolName=s.school_name or ""
-            )
-            for s in query
-        ]
-    elif institution_type == "2":  # Private
-        query = (
-            db.query(Tbprivateschools)
-            .filter(Tbprivateschools.state == state)
-            .order_by(Tbprivateschools.school_name.asc())
-            .distinct()
-            .all()
-        )
-        results = [
-            Schools(
-                school_id=str(s.lg_id),
-                school_name=s.school_name or ""
-            )
-            for s in query
-        ]
-    elif institution_type == "3":  # Colleges
-        query = (
-            db.query(Tbcolleges)
-            .filter(Tbcolleges.state == state)
-            .order_by(Tbcolleges.name.asc())
-            .distinct()
-            .all()
+    if institution_type not in SCHOOL_TYPES:
+        return []
+
+    query = (
+        db.query(t_school_dim.c.school_id, t_school_dim.c.name)
+        .filter(t_school_dim.c.school_type == int(institution_type), t_school_dim.c.state == state)
+        .order_by(t_school_dim.c.name.asc())
+        .all()
+    )
+    return [
+        Schools(
+            school_id=str(school_id),
+            school_name=school_name or ""
         )
-        results = [
-            Schools(
-                school_id=str(s.school_id),
-                school_name=s.name or ""
-            )
-            for s in query
-        ]
-    return results
+        for school_id, school_name in query
+    ]
 
 #-----------------------------------------------------------------------------------
 
-def get_ads(db:Session, type: str) -> List[Ads]:
+def get_schools_by_type(db: Session, institution_type: str) -> Dict[str, List[Schools]]:
     """
-    Retrieves a list of ads filtered by type.
-    - Could be used to load ads for a specific location, page, or user role.
+    Fetches the schools of every state for an institution type in one query, grouped by state.
+    - Selects only the id, name and state columns.
+    - Used to build all the school indexes at startup.
     """
     query = (
-        db.query(Tbads)
-        .filter(Tbads.type == type)
+        db.query(t_school_dim.c.school_id, t_school_dim.c.name, t_school_dim.c.state)
+        .filter(t_school_dim.c.school_type == int(institution_type))
+        .order_by(t_school_dim.c.state.asc(), t_school_dim.c.name.asc())
         .all()
     )
-    return query
+    schools: Dict[str, List[Schools]] = {}
+    for school_id, school_name, state in query:
+        schools.setdefault(state, []).append(Schools(school_id=str(school_id), school_name=school_name or ""))
+    return schools
+
+#-----------------------------------------------------------------------------------
+
+def get_school_index(db: Session, state: str, institution_type: str) -> Optional[CachedDataset]:
+    """
+    Returns the cached, name-sorted PrefixIndex of the schools in a state for an institution type.
+    - Built from get_schools_by_state on first use (or at startup, see warm_school_index).
+    - Returns None for unknown states or institution types so they are never cached.
+    """
+    if institution_type not in SCHOOL_TYPES:
+        return None
+    if state not in {st.abbreviation for st in get_states(db)}:
+        return None
+    return reference_cache.get_dataset("schools", db, (state, institution_type))
+
+def load_school_index(db: Session, key: Tuple[str, str]) -> PrefixIndex[Schools]:
+    state, institution_type = key
+    schools = get_schools_by_state(db, state, institution_type)
+    return PrefixIndex([(school.school_name, school) for school in schools])
+
+def search_schools(db: Session, state: str, institution_type: str, prefix: str, limit: int) -> List[Schools]:
+    """
+    Typeahead search over the schools of a state: the first `limit` schools whose name, or a
+    word in it, starts with `prefix`. Served from the in-memory school index.
+    """
+    index = get_school_index(db, state, institution_type)
+    return index.value.search(prefix, limit) if index else []
+
+def warm_school_index() -> None:
+    """
+    Builds the school index of every state and institution type, one query per type.
+    Called on application startup when SCHOOL_INDEX_PRELOAD is set.
+    """
+    db = SessionLocal()
+    try:
+        states = {st.abbreviation for st in get_states(db)}
+        for institution_type in SCHOOL_TYPES:
+            for state, schools in get_schools_by_type(db, institution_type).items():
+                if state in states:
+                    index = PrefixIndex([(school.school_name, school) for school in schools])
+                    reference_cache.put("schools", index, (state, institution_type))
+    finally:
+        db.close()
+
+#-----------------------------------------------------------------------------------
+
+def get_ads(db:Session, type: str) -> List[Ads]:
+    """
+    Retrieves a list of ads filtered by type from the reference data cache.
+    - Could be used to load ads for a specific location, page, or user role.
+    """
+    return reference_cache.get("ads", db).get(type, [])
+
+def load_ads(db: Session) -> Dict[str, List[Ads]]:
+    # All ads in one query, grouped by type
+    ads: Dict[str, List[Ads]] = {}
+    for row in db.query(Tbads).all():
+        ads.setdefault(row.type, []).append(Ads.model_validate(row, from_attributes=True))
+    return ads
 
 #-----------------------------------------------------------------------------------
 
 def get_recent_news(db:Session) -> List[RecentNews]:
     """
-    Retrieves a list of recent news items from the database.
+    Retrieves a list of recent news items from the reference data cache.
     - Could be displayed on a homepage, dashboard, or news feed.
     """
-    query = (
-        db.query(Tbrecentnews)
-        .all()
-    )
-    return query
+    return reference_cache.get("news", db)
+
+def load_recent_news(db: Session) -> List[RecentNews]:
+    rows = db.query(Tbrecentnews).all()
+    return [RecentNews.model_validate(row, from_attributes=True) for row in rows]
+
+#-----------------------------------------------------------------------------------
+
+def get_reference_dataset(dataset: str, db: Session) -> CachedDataset:
+    """
+    Returns the cached dataset (states, sports, ads or news) with its version.
+    - Used by the routes to build ETags once per dataset version.
+    """
+    return reference_cache.get_dataset(dataset, db)
+
+# names of the datasets registered below, accepted by invalidate_reference_data
+ReferenceDataset = Literal["states", "sports", "ads", "news", "schools"]
+
+reference_cache.register("states", load_states)
+reference_cache.register("sports", load_sports)
+reference_cache.register("ads", load_ads)
+reference_cache.register("news", load_recent_news)
+reference_cache.register("schools", load_school_index, keyed=True)
+
+def warm_reference_data() -> None:
+    """
+    Loads every reference dataset into memory. Called on application startup.
+    """
+    reference_cache.warm()
+
+def invalidate_reference_data(dataset: Optional[ReferenceDataset] = None) -> None:
+    """
+    Drops one reference dataset (states, sports, ads, news, schools) or all of them when dataset is None.
+    - Call after changing reference tables so the next request reloads them.
+    - Only affects this process, other instances reload when REFERENCE_CACHE_TTL_SECONDS runs out.
+    """
+    reference_cache.invalidate(dataset)
 
 #-----------------------------------------------------------------------------------
\ No newline at end of file
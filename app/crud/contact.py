@@ -12,6 +12,7 @@ from datetime import datetime
 from sqlalchemy import text
 from sqlalchemy.orm import Session  
 from typing import List
+from app.crud.timeline import rebuild_member_timeline
 from app.db.models.sp_db_models import Tbcontactrequests, Tbmemberprofile, Tbmessages
 from app.schemas.contact import MemberContacts, Search
 from sqlalchemy import or_
@@ -202,6 +203,10 @@ def set_delete_contact(db: Session, member_id: int, contact_id: int) -> None:
         SELECT public.sp_delete_contact(:member_id, :contact_id)
     """)
     db.execute(sql, {"member_id": member_id, "contact_id": contact_id})
+
+    # Contact lists changed on both sides, re-materialize both feed timelines
+    rebuild_member_timeline(db, member_id)
+    rebuild_member_timeline(db, contact_id)
     db.commit()
 
 #-----------------------------------------------------------------------------------
@@ -215,6 +220,10 @@ def set_accept_request(db: Session, member_id: int, contact_id: int) -> None:
         SELECT public.sp_accept_request(:member_id, :contact_id)
     """)
     db.execute(sql, {"member_id": member_id, "contact_id": contact_id})
+
+    # Contact lists changed on both sides, re-materialize both feed timelines
+    rebuild_member_timeline(db, member_id)
+    rebuild_member_timeline(db, contact_id)
     db.commit()
 
 #-----------------------------------------------------------------------------------
@@ -0,0 +1,216 @@
+# app/crud/email_outbox.py
+# Transactional email outbox. Registration and password reset used to send their email over
+# SMTP inside the request (connect, STARTTLS, login, send) and log-and-swallow any failure. Now:
+    # * enqueue() adds the email to tbemailoutbox in the caller's transaction, so it is sent
+    #   only if the change that triggered it commits, and the request returns right away
+    # * A background worker claims due rows by leasing them: one short transaction picks them with
+    #   FOR UPDATE SKIP LOCKED (several API instances or python -m app.tools.outbox_worker processes
+    #   can drain the same table) and moves next_attempt_at past the lease. The batch is then sent
+    #   over one SMTP connection outside any transaction, and marked in a second short transaction
+    # * Rows of a worker that died mid-batch become due again when their lease ends
+    # * Failed sends are retried with exponential backoff, and marked failed after EMAIL_OUTBOX_MAX_ATTEMPTS
+# Where no process lives long enough for the worker (Vercel), a cron job calls GET /api/common/email-outbox/drain
+# (see vercel.json), and python -m app.tools.outbox_worker drains it from a separate process elsewhere.
+# Delivery is at least once: an email sent just before the worker dies is sent again.
+
+import logging
+import threading
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.utils.email import build_message, open_smtp
+
+logger = logging.getLogger(__name__)
+
+EMAIL_PENDING = 0
+EMAIL_SENT = 1
+EMAIL_FAILED = 2
+
+INSERT_EMAIL_SQL = """
+    INSERT INTO public.tbemailoutbox (member_name, to_email, subject, body, is_body_html)
+    VALUES (:member_name, :to_email, :subject, :body, :is_body_html)
+"""
+
+# leases due rows to this worker: other workers skip the locked rows while this commits, then
+# skip them because they are no longer due. The attempt is counted here, so an email that makes
+# the worker die every time still reaches max_attempts.
+CLAIM_EMAILS_SQL = """
+    UPDATE public.tbemailoutbox o
+    SET next_attempt_at = now() + make_interval(secs => :lease), attempts = o.attempts + 1
+    WHERE o.email_id IN (
+        SELECT email_id
+        FROM public.tbemailoutbox
+        WHERE status = 0 AND next_attempt_at <= now()
+        ORDER BY next_attempt_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING o.email_id, o.member_name, o.to_email, o.subject, o.body, o.is_body_html, o.attempts
+"""
+
+MARK_SENT_SQL = """
+    UPDATE public.tbemailoutbox
+    SET status = 1, sent_at = now(), last_error = NULL
+    WHERE email_id = ANY(CAST(:email_ids AS BIGINT[])) AND status = 0
+"""
+
+# retry after base * 2^(attempts - 1) seconds (capped), or give up after max_attempts
+MARK_FAILED_SQL = """
+    UPDATE public.tbemailoutbox o
+    SET last_error = v.error,
+        status = CASE WHEN o.attempts >= :max_attempts THEN 2 ELSE 0 END,
+        next_attempt_at = now() + make_interval(secs => least(:base_delay * power(2, o.attempts - 1), :max_delay))
+    FROM unnest(CAST(:email_ids AS BIGINT[]), CAST(:errors AS TEXT[])) AS v(email_id, error)
+    WHERE o.email_id = v.email_id AND o.status = 0
+"""
+
+
+class EmailOutbox:
+
+    def __init__(self, session_factory: Callable[[], Session], poll_interval: float, batch_size: int, lease: float,
+                 max_attempts: int, retry_base_delay: float, retry_max_delay: float):
+        self._session_factory = session_factory
+        self._poll_interval = poll_interval
+        self._batch_size = batch_size
+        self._lease = lease
+        self._max_attempts = max_attempts
+        self._retry_base_delay = retry_base_delay
+        self._retry_max_delay = retry_max_delay
+        self._drain_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    #-----------------------------------------------------------------------------------
+
+    def enqueue(self, db: Session, member_name: str, to_email: str, subject: str, body: str, is_body_html: bool = True) -> None:
+        # Adds the email to the caller's transaction. The worker is woken once the caller commits.
+        db.execute(text(INSERT_EMAIL_SQL), {
+            "member_name": member_name,
+            "to_email": to_email,
+            "subject": subject,
+            "body": body,
+            "is_body_html": is_body_html
+        })
+        if self._worker is not None:
+            event.listen(db, "after_commit", self._wake_worker, once=True)
+
+    def _wake_worker(self, session: Session) -> None:
+        self._wake.set()
+
+    #-----------------------------------------------------------------------------------
+
+    def drain_batch(self) -> int:
+        # Claims up to batch_size due emails and sends them. Returns the number of emails claimed.
+        # No transaction is open while the SMTP server is talked to.
+        with self._drain_lock:
+            db = self._session_factory()
+            try:
+                rows = db.execute(text(CLAIM_EMAILS_SQL), {
+                    "batch_size": self._batch_size,
+                    "lease": self._lease
+                }).mappings().all()
+                db.commit()
+                if not rows:
+                    return 0
+
+                sent, failed = self._send(rows)
+
+                if sent:
+                    db.execute(text(MARK_SENT_SQL), {"email_ids": sent})
+                if failed:
+                    db.execute(text(MARK_FAILED_SQL), {
+                        "email_ids": [email_id for email_id, _ in failed],
+                        "errors": [error for _, error in failed],
+                        "max_attempts": self._max_attempts,
+                        "base_delay": self._retry_base_delay,
+                        "max_delay": self._retry_max_delay
+                    })
+                    attempts = {row["email_id"]: row["attempts"] for row in rows}
+                    for email_id, error in failed:
+                        if attempts[email_id] >= self._max_attempts:
+                            logger.error(f"Giving up on email {email_id} after {self._max_attempts} attempts: {error}")
+                db.commit()
+                return len(rows)
+            except Exception as e:
+                # unmarked rows are sent again when their lease ends
+                db.rollback()
+                logger.error(f"Failed to drain the email outbox: {e}")
+                return 0
+            finally:
+                db.close()
+
+    def _send(self, rows) -> Tuple[List[int], List[Tuple[int, str]]]:
+        # One SMTP connection for the batch. Returns the sent email ids and the (email id, error) of the failed ones.
+        sent: List[int] = []
+        failed: List[Tuple[int, str]] = []
+        try:
+            with open_smtp() as server:
+                for row in rows:
+                    try:
+                        msg = build_message(row["member_name"], row["to_email"], row["subject"], row["body"], row["is_body_html"])
+                        server.send_message(msg)
+                        sent.append(row["email_id"])
+                    except Exception as e:
+                        logger.warning(f"Failed to send email {row['email_id']} to {row['to_email']}: {e}")
+                        failed.append((row["email_id"], str(e)))
+        except Exception as e:   # connect, STARTTLS or login failed, or the connection dropped
+            logger.warning(f"SMTP connection failed: {e}")
+            done = set(sent) | {email_id for email_id, _ in failed}
+            failed.extend((row["email_id"], str(e)) for row in rows if row["email_id"] not in done)
+        return sent, failed
+
+    def drain(self, max_batches: Optional[int] = None) -> int:
+        # Sends batches until no due email is left, or max_batches were sent. Returns the number of emails processed.
+        total = 0
+        batches = 0
+        while not self._stopping.is_set() and (max_batches is None or batches < max_batches):
+            claimed = self.drain_batch()
+            total += claimed
+            batches += 1
+            if claimed < self._batch_size:
+                break
+        return total
+
+    #-----------------------------------------------------------------------------------
+
+    def start(self) -> None:
+        # Starts the background thread that drains the outbox every poll_interval seconds
+        # (or as soon as a request that queued an email commits).
+        if self._worker is not None:
+            return
+        self._stopping.clear()
+        self._worker = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        # Stops the background thread (or run_forever). Pending emails stay in the table for the next start.
+        self._stopping.set()
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def run_forever(self) -> None:
+        # Drains in the calling thread until stop() is called from elsewhere (app.tools.outbox_worker)
+        self._stopping.clear()
+        self._run()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self.drain()
+            self._wake.wait(self._poll_interval)
+            self._wake.clear()
+
+
+email_outbox = EmailOutbox(
+    SessionLocal,
+    poll_interval=settings.EMAIL_OUTBOX_POLL_SECONDS,
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    lease=settings.EMAIL_OUTBOX_LEASE_SECONDS,
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    retry_base_delay=settings.EMAIL_RETRY_BASE_SECONDS,
+    retry_max_delay=settings.EMAIL_RETRY_MAX_SECONDS
+)
@@ -0,0 +1,137 @@
+# app/crud/like_buffer.py
+# Write-behind buffer for post like counters. Instead of one UPDATE + commit per click on
+# tbmemberposts.like_counter (a row-lock hotspot on popular posts), it:
+    # * Coalesces increments per post_id in process memory
+    # * Flushes them in one batched UPDATE on a timer or when enough clicks are buffered
+    # * Exposes buffered counts so feed reads can add them to the stored counter
+    # * Flushes whatever is left on application shutdown
+# Unflushed clicks are lost if the process dies without shutting down, which is acceptable for likes.
+# increment() and buffered_count() run on the request path (the event loop), so _lock only guards
+# the dicts and is never held across a database round trip; flushes only run on the background thread
+# and at shutdown. A feed read that overlaps the commit of a flush can count that batch twice (or not
+# at all, depending on when it read like_counter) for that one read.
+# Buffered counts are per process, so only enable it (LIKE_BUFFER_ENABLED) on long-running servers,
+# not on serverless deployments where instances are frozen or recycled without a shutdown.
+
+import logging
+import threading
+from typing import Callable, Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# One statement for the whole batch: the arrays are unnested into (post_id, amount) rows
+FLUSH_LIKES_SQL = """
+    UPDATE public.tbmemberposts p
+    SET like_counter = COALESCE(p.like_counter, 0) + v.amount
+    FROM unnest(CAST(:post_ids AS BIGINT[]), CAST(:amounts AS BIGINT[])) AS v(post_id, amount)
+    WHERE p.post_id = v.post_id
+"""
+
+
+class LikeCounterBuffer:
+
+    def __init__(self, session_factory: Callable[[], Session], flush_interval: float, flush_threshold: int):
+        self._session_factory = session_factory
+        self._flush_interval = flush_interval
+        self._flush_threshold = flush_threshold
+        self._pending: Dict[int, int] = {}
+        self._in_flight: Dict[int, int] = {}   # taken by a flush that has not committed yet
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    #-----------------------------------------------------------------------------------
+
+    def increment(self, post_id: int, amount: int = 1) -> None:
+        with self._lock:
+            self._pending[post_id] = self._pending.get(post_id, 0) + amount
+            self._pending_total += amount
+            threshold_reached = self._pending_total >= self._flush_threshold
+
+        if threshold_reached:
+            self._wake.set()   # flushed by the worker, stop() flushes what is left if it never ran
+
+    #-----------------------------------------------------------------------------------
+
+    def buffered_count(self, post_id: int) -> int:
+        # Likes accepted for the post but not yet committed to tbmemberposts
+        with self._lock:
+            return self._pending.get(post_id, 0) + self._in_flight.get(post_id, 0)
+
+    #-----------------------------------------------------------------------------------
+
+    def flush(self) -> int:
+        # Writes all buffered increments in one UPDATE. Returns the number of posts updated.
+        # On failure the increments go back into the buffer and are retried on the next flush.
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                self._in_flight = batch
+                self._pending = {}
+                self._pending_total = 0
+
+            if not batch:
+                return 0
+
+            db = self._session_factory()
+            try:
+                db.execute(text(FLUSH_LIKES_SQL), {
+                    "post_ids": list(batch.keys()),
+                    "amounts": list(batch.values())
+                })
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to flush like counters: {e}")
+                with self._lock:
+                    for post_id, amount in batch.items():
+                        self._pending[post_id] = self._pending.get(post_id, 0) + amount
+                        self._pending_total += amount
+                    self._in_flight = {}
+                return 0
+            finally:
+                db.close()
+
+            with self._lock:
+                self._in_flight = {}   # the stored counters include the batch now
+            return len(batch)
+
+    #-----------------------------------------------------------------------------------
+
+    def start(self) -> None:
+        # Starts the background thread that flushes every flush_interval seconds
+        # (or sooner when increment() reports the size threshold was reached).
+        if self._worker is not None:
+            return
+        self._stopping.clear()
+        self._worker = threading.Thread(target=self._run, name="like-counter-flush", daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        # Stops the background thread and flushes what is left in the buffer.
+        if self._worker is not None:
+            self._stopping.set()
+            self._wake.set()
+            self._worker.join()
+            self._worker = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+like_buffer = LikeCounterBuffer(
+    SessionLocal,
+    flush_interval=settings.LIKE_FLUSH_INTERVAL_SECONDS,
+    flush_threshold=settings.LIKE_FLUSH_THRESHOLD
+)
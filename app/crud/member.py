@@ -6,40 +6,100 @@
 # * Handling education history
 # * Linking social media accounts (YouTube, Instagram)
 # * Managing contacts and following/friend relationships
+# * Loading a whole member profile page in one call
 # * It uses SQLAlchemy for DB access and also uses some PostgreSQL stored procedures. It also connects with YouTube’s API to fetch videos and playlists from a member's channel.
+# * All functions are async (AsyncSession on the asyncpg engine), except invalidate_member_profile which only touches the in-process cache.
 
 from datetime import datetime
 import os
-from fastapi import Depends
-import requests
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
-from typing import List
-from pytest import Session
-from sqlalchemy import func, select, text
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, or_, select, text
 from app.db.models.sp_db_models import Tbcontacts, Tbinterests, Tbmemberfollowing, Tbmemberpostresponses, Tbmemberposts, Tbmemberprofile, Tbmemberprofilecontactinfo, Tbmemberprofileeducationv2, Tbmembers
-from app.db.session import get_db
-from app.schemas.member import ContactInfo, EducationInfo, GeneralInfo, PostResponses, Posts, YoutubeChannel, YoutubePlayList, YoutubeVideos, InstagramURL
+from app.core.config import settings
+from app.crud.like_buffer import like_buffer
+from app.crud.timeline import fan_out_ctes, fan_out_params, get_timeline_posts, is_timeline_trimmed
+from app.utils.cache import LRUCache
+from app.utils.cursor import encode_cursor, seek_before, sort_date
+from app.schemas.member import ContactInfo, EducationInfo, GeneralInfo, MemberProfile, PostResponses, PostResponsesPage, Posts, PostsPage, YoutubeChannel, YoutubePlayList, YoutubeVideos, InstagramURL
 
 #-----------------------------------------------------------------------------------
 
-def get_recent_posts(member_id: int, db:Session) -> List[Posts]:
-    # Step 1: Get list of contact IDs for the member
+async def get_recent_posts(member_id: int, db: AsyncSession, limit: int = 50, cursor: Optional[Tuple[datetime, int]] = None, include_comments: int = 0) -> PostsPage:
+    # Step 1: Read the page from the member's materialized timeline (one indexed range scan).
+    # Members with very large contact lists, and pages past the end of a timeline that was trimmed
+    # to TIMELINE_MAX_LENGTH, are built on read from the contacts' posts instead.
+    contact_count = await db.scalar(
+        select(func.count(Tbcontacts.contact_id))
+        .where(Tbcontacts.member_id == member_id)
+    )
+
+    posts = None
+    if contact_count <= settings.TIMELINE_READ_FANOUT_THRESHOLD:
+        posts = await get_timeline_posts(db, member_id, limit + 1, cursor)
+        if len(posts) <= limit and await is_timeline_trimmed(db, member_id):
+            posts = None  # past the end of the timeline, older posts were trimmed
+
+    if posts is None:
+        posts = await get_fan_out_on_read_posts(db, member_id, limit + 1, cursor)
+
+    # Step 2: One extra row was fetched to tell whether there is a next page.
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(posts[-1].post_date, posts[-1].post_id)
+
+    # Step 3: Count the responses for every post on the page in one grouped query,
+    # or, when comment previews are requested, get counts and previews from one windowed query
+    post_ids = [post.post_id for post in posts]
+    comment_previews = {}
+    if include_comments > 0:
+        comment_previews, child_post_counts = await get_comment_previews(db, post_ids, include_comments)
+    else:
+        child_post_counts = await get_child_post_counts(db, post_ids)
+
+    # Step 4: Format into MemberPostsModel list
+    result = []
+    for post in posts:
+        child_post_count = child_post_counts.get(post.post_id, 0)
+
+        result.append(Posts(
+            post_id=str(post.post_id),
+            title=post.title or "",
+            description=post.description or "",
+            date_posted=str(post.post_date) if post.post_date else "",
+            AttachFile=post.attach_file or "",
+            member_id=str(post.member_id),
+            picture_path=post.picture_path or "default.png",
+            member_name=f"{post.first_name} {post.last_name}",
+            first_name=post.first_name or "",
+            child_post_count=str(child_post_count),
+            like_counter=(post.like_counter or 0) + like_buffer.buffered_count(post.post_id),
+            comments=comment_previews.get(post.post_id, []) if include_comments > 0 else None
+        ))
+
+    return PostsPage(posts=result, next_cursor=next_cursor)
+
+#-----------------------------------------------------------------------------------
+
+async def get_fan_out_on_read_posts(db: AsyncSession, member_id: int, limit: int, cursor: Optional[Tuple[datetime, int]] = None) -> List:
+    # Contact IDs stay in the database as a subquery instead of an IN (...) list built in Python,
+    # since this path serves the members with the largest contact lists.
     contact_ids = (
-        db.query(Tbcontacts.contact_id)
-        .filter(Tbcontacts.member_id == member_id)
-        .all()
+        select(Tbcontacts.contact_id)
+        .where(Tbcontacts.member_id == member_id)
     )
-    
-    # Flatten result and include the original member
-    contact_id_list = [cid[0] for cid in contact_ids]
-    contact_id_list.append(member_id)
 
-    # Step 2: Query posts by member and their contacts
+    # Query posts by member and their contacts.
+    # Keyset pagination: order by (post_date, post_id) and seek past the cursor instead of using
+    # OFFSET, so every page is an index range scan.
     member_alias = aliased(Tbmemberposts)
     profile_alias = aliased(Tbmemberprofile)
 
-    posts = (
-        db.query(
+    query = (
+        select(
             member_alias.post_id,
             member_alias.title,
             member_alias.description,
@@ -52,163 +112,255 @@ def get_recent_posts(member_id: int, db:Session) -> List[Posts]:
             member_alias.like_counter
         )
         .join(profile_alias, member_alias.member_id == profile_alias.member_id)
-        .filter(member_alias.member_id.in_(contact_id_list))
-        .order_by(member_alias.post_date.desc())
-        .limit(50)
-        .all()
+        .where(or_(member_alias.member_id == member_id, member_alias.member_id.in_(contact_ids)))
     )
 
-    # Step 3: Format into MemberPostsModel list
-    result = []
-    for post in posts:
-        child_post_count = db.query(Tbmemberpostresponses).filter(
-            Tbmemberpostresponses.post_id == post.post_id
-        ).count()
+    if cursor:
+        query = query.where(seek_before(member_alias.post_date, member_alias.post_id, cursor))
 
-        result.append(Posts(
-            post_id=str(post.post_id),
-            title=post.title or "",
-            description=post.description or "",
-            date_posted=str(post.post_date) if post.post_date else "",
-            AttachFile=post.attach_file or "",
-            member_id=str(post.member_id),
-            picture_path=post.picture_path or "default.png",
-            member_name=f"{post.first_name} {post.last_name}",
-            first_name=post.first_name or "",
-            child_post_count=str(child_post_count),
-            like_counter=post.like_counter
-        ))
+    result = await db.execute(
+        query
+        .order_by(sort_date(member_alias.post_date).desc(), member_alias.post_id.desc())
+        .limit(limit)
+    )
+    return result.all()
+
+#-----------------------------------------------------------------------------------
+
+async def get_child_post_counts(db: AsyncSession, post_ids: List[int]) -> Dict[int, int]:
+    # Returns {post_id: response count} for the given posts using a single GROUP BY query.
+    # Posts without responses are not in the result, callers default them to 0.
+    if not post_ids:
+        return {}
 
-    return result
+    rows = await db.execute(
+        select(
+            Tbmemberpostresponses.post_id,
+            func.count(Tbmemberpostresponses.post_response_id)
+        )
+        .where(Tbmemberpostresponses.post_id.in_(post_ids))
+        .group_by(Tbmemberpostresponses.post_id)
+    )
+    return {post_id: count for post_id, count in rows}
 
 #-----------------------------------------------------------------------------------
 
-def get_recent_post_responses(db: Session, post_id: int) -> List[PostResponses]:
-    sql = text(""" SELECT * FROM public.sp_get_member_child_posts( :post_id) """) 
-    result = db.execute(sql, {"post_id": post_id})
-    # Use .mappings() to get rows as dictionaries
-    rows = result.mappings().all()
-    return [PostResponses(**row) for row in rows]
+async def get_comment_previews(db: AsyncSession, post_ids: List[int], per_post: int) -> Tuple[Dict[int, List[PostResponses]], Dict[int, int]]:
+    # Loads the latest `per_post` comments of every post on a feed page in one query, ranking the
+    # comments with ROW_NUMBER() over post_id. The same window also counts each post's comments,
+    # so the feed does not need a separate count query. Returns (previews, counts) keyed by post_id.
+    # The profile is outer joined so the counts match get_child_post_counts, which counts every comment.
+    if not post_ids:
+        return {}, {}
+
+    ranked = (
+        select(
+            Tbmemberpostresponses.post_response_id,
+            Tbmemberpostresponses.post_id,
+            Tbmemberpostresponses.description,
+            Tbmemberpostresponses.response_date,
+            Tbmemberpostresponses.member_id,
+            Tbmemberprofile.picture_path,
+            Tbmemberprofile.first_name,
+            Tbmemberprofile.last_name,
+            func.row_number().over(
+                partition_by=Tbmemberpostresponses.post_id,
+                order_by=(sort_date(Tbmemberpostresponses.response_date).desc(), Tbmemberpostresponses.post_response_id.desc())
+            ).label("rn"),
+            func.count().over(partition_by=Tbmemberpostresponses.post_id).label("response_count")
+        )
+        .outerjoin(Tbmemberprofile, Tbmemberpostresponses.member_id == Tbmemberprofile.member_id)
+        .where(Tbmemberpostresponses.post_id.in_(post_ids))
+        .subquery()
+    )
+
+    rows = (await db.execute(
+        select(ranked)
+        .where(ranked.c.rn <= per_post)
+        .order_by(ranked.c.post_id, ranked.c.rn)
+    )).all()
+
+    previews: Dict[int, List[PostResponses]] = {}
+    counts: Dict[int, int] = {}
+    for row in rows:
+        previews.setdefault(row.post_id, []).append(to_post_response(row))
+        counts[row.post_id] = row.response_count
+    return previews, counts
 
 #-----------------------------------------------------------------------------------
 
-def set_increment_post_like_counter(db: Session, post_id: int) -> None:
-    sql = text(""" SELECT public.sp_increment_like_counter (:post_id) """)
-    db.execute(sql, {"post_id": post_id})
-    db.commit()
+def to_post_response(row) -> PostResponses:
+    # Maps a comment row joined to the commenter's profile to the PostResponses schema
+    return PostResponses(
+        post_response_id=row.post_response_id,
+        post_id=row.post_id,
+        description=row.description or "",
+        date_responded=str(row.response_date) if row.response_date else "",
+        member_id=row.member_id,
+        member_name=f"{row.first_name} {row.last_name}",
+        first_name=row.first_name or "",
+        picture_path=row.picture_path or "default.png"
+    )
 
 #-----------------------------------------------------------------------------------
 
-def create_member_post(member_id: int, db: Session, post_msg: str) -> Posts | None:
-    # Execute the stored procedure
-    sql = text(""" SELECT public.sp_create_member_post(:member_id, :post_msg) """)
-    db.execute(sql, {"member_id": member_id, "post_msg": post_msg})
-    db.commit()
+# First thread pages keyed by post_id -> {limit: PostResponsesPage}, at most COMMENT_CACHE_PAGE_SIZES
+# page sizes per post. Later pages (cursor set) are always read from the database, so client
+# cursors can't grow the cache. create_member_post_response drops the post's entry so new
+# comments show up right away.
+COMMENT_CACHE_PAGE_SIZES = 4
+comment_cache = LRUCache(maxsize=settings.COMMENT_CACHE_SIZE, ttl=settings.COMMENT_CACHE_TTL_SECONDS)
 
-    # Table aliases
-    post_alias = aliased(Tbmemberposts)
-    profile_alias = aliased(Tbmemberprofile)
+async def get_recent_post_responses(db: AsyncSession, post_id: int, limit: int = 20, cursor: Optional[Tuple[datetime, int]] = None) -> PostResponsesPage:
+    generation = comment_cache.generation()
+    pages = comment_cache.get(post_id) if cursor is None else None
+    if pages is not None and limit in pages:
+        return pages[limit]
 
-    # Correlated subquery for counting post responses
-    child_post_count_subquery = (
-        select(func.count(Tbmemberpostresponses.post_id))
-        .where(Tbmemberpostresponses.post_id == post_alias.post_id)
-        .correlate(post_alias)
-        .scalar_subquery()
-        .label("child_post_cnt")
-    )
+    # Newest comments first, keyset paginated on (response_date, post_response_id)
+    response_alias = aliased(Tbmemberpostresponses)
+    profile_alias = aliased(Tbmemberprofile)
 
-    # Main query to fetch the most recent post
-    result = (
-        db.query(
-            post_alias.post_id,
-            post_alias.title,
-            post_alias.description,
-            post_alias.post_date.label("date_posted"),
-            post_alias.attach_file,
-            post_alias.member_id,
+    query = (
+        select(
+            response_alias.post_response_id,
+            response_alias.post_id,
+            response_alias.description,
+            response_alias.response_date,
+            response_alias.member_id,
             profile_alias.picture_path,
             profile_alias.first_name,
-            profile_alias.last_name,
-            child_post_count_subquery,
-            post_alias.like_counter
+            profile_alias.last_name
         )
-        .join(profile_alias, post_alias.member_id == profile_alias.member_id)
-        .filter(post_alias.member_id == member_id)
-        .order_by(post_alias.post_id.desc())
-        .first()
+        .outerjoin(profile_alias, response_alias.member_id == profile_alias.member_id)
+        .where(response_alias.post_id == post_id)
     )
 
+    if cursor:
+        query = query.where(seek_before(response_alias.response_date, response_alias.post_response_id, cursor))
+
+    rows = (await db.execute(
+        query
+        .order_by(sort_date(response_alias.response_date).desc(), response_alias.post_response_id.desc())
+        .limit(limit + 1)
+    )).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].response_date, rows[-1].post_response_id)
+
+    page = PostResponsesPage(
+        post_responses=[to_post_response(row) for row in rows],
+        next_cursor=next_cursor
+    )
+
+    if cursor is None:
+        pages = dict(pages or {})
+        if len(pages) >= COMMENT_CACHE_PAGE_SIZES:
+            pages.pop(next(iter(pages)))
+        pages[limit] = page
+        comment_cache.set(post_id, pages, generation=generation)   # skipped if a comment was added meanwhile
+    return page
+
+#-----------------------------------------------------------------------------------
+
+async def set_increment_post_like_counter(db: AsyncSession, post_id: int) -> None:
+    # Buffered in process and flushed in batches, see app/crud/like_buffer.py
+    if settings.LIKE_BUFFER_ENABLED:
+        like_buffer.increment(post_id)
+        return
+
+    sql = text(""" SELECT public.sp_increment_like_counter (:post_id) """)
+    await db.execute(sql, {"post_id": post_id})
+    await db.commit()
+
+#-----------------------------------------------------------------------------------
+
+async def create_member_post(member_id: int, db: AsyncSession, post_msg: str) -> Posts | None:
+    # Creates the post with sp_create_member_post, then fans it out to the member timelines and reads
+    # it back joined to the author profile, all in one transaction. The transaction-scoped advisory lock
+    # serializes a member's concurrent posts, so their newest post is the one this call created.
+    await db.execute(text("""
+        SELECT pg_advisory_xact_lock(hashtext('create_member_post'), CAST(:member_id % 2147483647 AS integer))
+    """), {"member_id": member_id})
+    await db.execute(text(""" SELECT public.sp_create_member_post(:member_id, :post_msg) """), {
+        "member_id": member_id,
+        "post_msg": post_msg
+    })
+
+    sql = text(f"""
+        WITH new_post AS (
+            SELECT post_id, title, description, post_date, attach_file, member_id, like_counter
+            FROM public.tbmemberposts
+            WHERE member_id = :member_id
+            ORDER BY post_id DESC
+            LIMIT 1
+        ),
+        {fan_out_ctes("new_post")}
+        SELECT np.post_id, np.title, np.description, np.post_date, np.attach_file, np.member_id, np.like_counter,
+               p.picture_path, p.first_name, p.last_name
+        FROM new_post np
+        JOIN public.tbmemberprofile p ON p.member_id = np.member_id
+    """)
+    result = (await db.execute(sql, {"member_id": member_id, **fan_out_params()})).first()
+    await db.commit()
+
     if result:
         return Posts(
             post_id=str(result.post_id),
             title=result.title or "",
             description=result.description or "",
-            date_posted=str(result.date_posted) if result.date_posted else "",
+            date_posted=str(result.post_date) if result.post_date else "",
             attach_file=result.attach_file or "",
             member_id=str(result.member_id),
             picture_path=result.picture_path or "default.png",
             member_name=f"{result.first_name} {result.last_name}",
             first_name=result.first_name or "",
-            child_post_cnt=str(result.child_post_cnt),
-            like_counter=result.like_counter
+            child_post_count="0",  # a new post has no responses yet
+            like_counter=result.like_counter or 0
         )
 
     return None
 
 #-----------------------------------------------------------------------------------
 
-def create_member_post_response(db: Session, member_id:int, post_id:int, post_msg:str) -> PostResponses | None:
-    sql = text(""" SELECT public.sp_create_post_comment(:member_id, :post_id, :post_msg) """)
-    db.execute(sql, {
+async def create_member_post_response(db: AsyncSession, member_id:int, post_id:int, post_msg:str) -> PostResponses | None:
+    # Inserts the comment and reads it back joined to the commenter's profile (if any) in one statement.
+    # RETURNING gives us the exact row created for this post, even when the member is
+    # commenting on several posts at the same time.
+    sql = text("""
+        WITH new_response AS (
+            INSERT INTO public.tbmemberpostresponses (post_id, description, response_date, member_id)
+            VALUES (:post_id, :post_msg, now(), :member_id)
+            RETURNING post_response_id, post_id, description, response_date, member_id
+        )
+        SELECT r.post_response_id, r.post_id, r.description, r.response_date, r.member_id,
+               p.picture_path, p.first_name, p.last_name
+        FROM new_response r
+        LEFT JOIN public.tbmemberprofile p ON p.member_id = r.member_id
+    """)
+    result = (await db.execute(sql, {
         "member_id": member_id,
         "post_id": post_id,
         "post_msg": post_msg
-    })
-    db.commit()
-
-    # Query to fetch the newly created comment
-    response_alias = aliased(Tbmemberpostresponses)
-    profile_alias = aliased(Tbmemberprofile)
-
-    result = (
-        db.query(
-            response_alias.post_response_id,
-            response_alias.description,
-            response_alias.response_date,
-            response_alias.member_id,
-            profile_alias.picture_path,
-            profile_alias.first_name,
-            profile_alias.last_name
-        )
-        .join(profile_alias, response_alias.member_id == profile_alias.member_id)
-        .filter(response_alias.member_id == member_id)
-        .order_by(response_alias.post_response_id.desc())
-        .first()
-    )
+    })).first()
+    await db.commit()
+    comment_cache.pop(post_id)
 
     if result:
-        return PostResponses(
-            PostID=post_id,
-            post_response_id=result.post_response_id,
-            description=result.description,
-            date_responded=str(result.response_date),
-            member_id=result.member_id,
-            picture_path=result.picture_path,
-            member_name=f"{result.first_name} {result.last_name}",
-            first_name=result.first_name
-        )
+        return to_post_response(result)   # same defaults as the thread pages, the commenter may have no profile row
 
     return None
 
 #-----------------------------------------------------------------------------------
 
-def get_member_general_info(db: Session,member_id: int) -> GeneralInfo:
+async def get_member_general_info(db: AsyncSession,member_id: int) -> GeneralInfo:
     # Left outer join setup using SQLAlchemy
     interest_alias = aliased(Tbinterests)
 
-    result = (
-        db.query(
+    result = (await db.execute(
+        select(
             Tbmemberprofile.member_id,
             Tbmemberprofile.first_name,
             Tbmemberprofile.middle_name,
@@ -244,9 +396,8 @@ def get_member_general_info(db: Session,member_id: int) -> GeneralInfo:
             interest_alias,
             Tbmemberprofile.interested_in_type == interest_alias.interest_id
         )
-        .filter(Tbmemberprofile.member_id == member_id)
-        .first()
-    )
+        .where(Tbmemberprofile.member_id == member_id)
+    )).first()
 
     if not result:
         raise ValueError(f"No profile found for member_id {member_id}")
@@ -286,53 +437,37 @@ def get_member_general_info(db: Session,member_id: int) -> GeneralInfo:
 
 #-----------------------------------------------------------------------------------
 
-def get_member_contact_info(db: Session,member_id: int) -> ContactInfo:
-    return (
-        db.query(Tbmemberprofilecontactinfo)
-        .filter(Tbmemberprofilecontactinfo.member_id == member_id)
-        .first()
+async def get_member_contact_info(db: AsyncSession,member_id: int) -> ContactInfo:
+    return await db.scalar(
+        select(Tbmemberprofilecontactinfo)
+        .where(Tbmemberprofilecontactinfo.member_id == member_id)
     )
 
 #-----------------------------------------------------------------------------------
 
-def get_member_education_info(db: Session, member_id: int) -> List[EducationInfo]:
+# One probe of the school_dim unique index (school_type, school_id) per education row,
+# whatever the school type (see app/db/sql/006_school_dim.sql).
+EDUCATION_INFO_SQL = """
+    SELECT e.member_id, e.school_id, e.school_type, e.class_year, e.major, e.degree_type,
+        e.societies, e.description,
+        d.degree_type_desc, e.sport_level_type, s.school_type_desc,
+        sd.name as school_name, sd.address,
+        (case e.school_type when 3 then sd.image else 'default.png' end) as file_image
+
+    FROM public.tbmemberprofileeducationv2 e
+    left JOIN public.tbdegreetype d on e.degree_type = d.degree_type_id
+    left JOIN public.tbschooltype s on e.school_type = s.school_type_id
+    left JOIN public.school_dim sd on sd.school_type = e.school_type and sd.school_id = e.school_id
+    where e.member_id = :member_id
+    Order by e.class_year desc
+"""
+
+async def get_member_education_info(db: AsyncSession, member_id: int) -> List[EducationInfo]:
     education_list: List[EducationInfo] = []
 
-    sql =  text(""" 
-            SELECT e.member_id, e.school_id, e.school_type, e.class_year, e.major, e.degree_type, 
-                 e.societies, e.description,
-                 d.degree_type_desc, e.sport_level_type, s.school_type_desc,
-
-                (case e.school_type when 3  then
-                    (select name from public.tbcolleges c where c.school_id=e.school_id) 
-                    when 2 then
-                        (select school_name  from public.tbprivateschools p  where p.lg_id = e.school_id)
-                    when 1 then 
-                        (select school_name  from public.tbpublicschools p  where p.lgid = e.school_id)
-                    end ) as school_name,
-
-                (case e.school_type when 3  then
-                    (Select address From public.tbcolleges c  where c.school_id=e.school_id) 
-                        when 2 then
-                        (select school_name  from public.tbprivateschools p where p.lg_id = e.school_id)
-                    when 1 then 
-                        (select street_name || ', ' || city || ', ' || state || ' ' || zip
-                         from public.tbpublicschools p where p.lgid = e.school_id)
-                    end ) as address,
-
-                (case e.school_type when 3  then
-                    (Select c.website From public.tbcolleges c  where c.school_id=e.school_id) 
-                    else
-                        'default.png'
-                    end ) as file_image
-            
-                    FROM public.tbmemberprofileeducationv2 e 
-                    left JOIN public.tbdegreetype d on e.degree_type = d.degree_type_id
-                    left JOIN public.tbschooltype s on e.school_type = s.school_type_id where member_id = :member_id 
-                    Order by class_year desc
-             """)
+    sql = text(EDUCATION_INFO_SQL)
     
-    result = db.execute(sql, {"member_id": member_id})
+    result = await db.execute(sql, {"member_id": member_id})
 
     # Use .mappings() to get dictionary-like access to columns
     for row in result.mappings():
@@ -354,7 +489,7 @@ def get_member_education_info(db: Session, member_id: int) -> List[EducationInfo
 
 #-----------------------------------------------------------------------------------
 
-def get_videos_list(playlist_id: str) -> List[YoutubeVideos]:
+async def get_videos_list(playlist_id: str) -> List[YoutubeVideos]:
     # Load your API key from environment or configuration
     api_key = os.getenv("YOUTUBE_API_KEY", "")
 
@@ -366,7 +501,8 @@ def get_videos_list(playlist_id: str) -> List[YoutubeVideos]:
         "key": api_key
     }
 
-    response = requests.get(url, params=params)
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, params=params)
     response.raise_for_status()  # Raise exception on HTTP error
 
     items = response.json().get("items", [])
@@ -395,12 +531,12 @@ def get_videos_list(playlist_id: str) -> List[YoutubeVideos]:
 
 #-----------------------------------------------------------------------------------
 
-def get_youtube_playlist(member_id: int, db:Session) -> List[YoutubePlayList]:
+async def get_youtube_playlist(member_id: int, db: AsyncSession) -> List[YoutubePlayList]:
     playlists: List[YoutubePlayList] = []
 
     try:
-        member = (
-        db.query(Tbmembers).filter(Tbmembers.member_id == member_id).first())
+        member = await db.scalar(
+        select(Tbmembers).where(Tbmembers.member_id == member_id))
 
         if member:
          channel_id = member.youtube_channel
@@ -418,7 +554,8 @@ def get_youtube_playlist(member_id: int, db:Session) -> List[YoutubePlayList]:
                 "key": api_key
             }
 
-            response = requests.get(url, params=params)
+            async with httpx.AsyncClient() as client:
+                response = await client.get(url, params=params)
             response.raise_for_status()
 
             items = response.json().get("items", [])
@@ -448,34 +585,126 @@ def get_youtube_playlist(member_id: int, db:Session) -> List[YoutubePlayList]:
 
 #-----------------------------------------------------------------------------------
 
-def check_is_friend_by_contact_id(db: Session, member_id:int, contact_id:int) -> bool:
-    exists = (
-        db.query(Tbcontacts)
-        .filter(
+async def check_is_friend_by_contact_id(db: AsyncSession, member_id:int, contact_id:int) -> bool:
+    exists = await db.scalar(
+        select(Tbcontacts)
+        .where(
             Tbcontacts.member_id == member_id,
             Tbcontacts.contact_id == contact_id
         )
-        .first()
     )
     return exists is not None    
 
 #-----------------------------------------------------------------------------------
 
-def check_is_following_contact(db: Session, member_id:int, contact_id:int) -> bool:
-    exists = (
-        db.query(Tbmemberfollowing)
-        .filter(
+async def check_is_following_contact(db: AsyncSession, member_id:int, contact_id:int) -> bool:
+    exists = await db.scalar(
+        select(Tbmemberfollowing)
+        .where(
             Tbmemberfollowing.member_id == member_id,
             Tbmemberfollowing.following_member_id == contact_id
         )
-        .first()
     )
     return exists is not None    
 
 #-----------------------------------------------------------------------------------
 
-def set_member_general_info(db: Session, data: GeneralInfo):
-    profile = db.query(Tbmemberprofile).filter(Tbmemberprofile.member_id == data.member_id).first()
+# Profile documents (everything get_member_profile returns except the viewer relations) keyed by member_id,
+# and single sections read by the per-section routes keyed by (member_id, section).
+# Every writer of profile data calls invalidate_member_profile after its commit; fills pass the cache
+# generation taken before loading, so a fill racing with an invalidation is not cached.
+profile_cache = LRUCache(maxsize=settings.PROFILE_CACHE_SIZE, ttl=settings.PROFILE_CACHE_TTL_SECONDS)
+
+async def get_member_profile_document(db: AsyncSession, member_id: int) -> MemberProfile:
+    """
+    Returns the member's general, contact and education info, youtube channel and instagram url,
+    from the profile cache or, on a miss, from the database in one session.
+    - The contact info row is read once and also gives the instagram url.
+    - The reads run one after the other: a session holds one connection and cannot run
+      statements concurrently, and they are all single index lookups.
+    - The returned document is shared, callers must not modify it.
+    Raises ValueError when the member has no profile.
+    """
+    profile = profile_cache.get(member_id)
+    if profile is not None:
+        return profile
+
+    generation = profile_cache.generation()
+    general_info = await get_member_general_info(db, member_id)
+    contact = await get_member_contact_info(db, member_id)
+
+    profile = MemberProfile(
+        general_info=general_info,
+        contact_info=ContactInfo.model_validate(contact, from_attributes=True) if contact else None,
+        education_info=await get_member_education_info(db, member_id),
+        youtube_channel=await get_youtube_channel(db, member_id),
+        instagram_url=contact.instagram if contact and contact.instagram else ""
+    )
+    profile_cache.set(member_id, profile, generation=generation)
+    return profile
+
+async def load_contact_info_section(db: AsyncSession, member_id: int) -> Optional[ContactInfo]:
+    contact = await get_member_contact_info(db, member_id)
+    return ContactInfo.model_validate(contact, from_attributes=True) if contact else None
+
+PROFILE_SECTIONS = ("general_info", "contact_info", "education_info", "youtube_channel", "instagram_url")
+
+async def get_member_profile_section(db: AsyncSession, member_id: int, section: str):
+    """
+    Returns one section of the profile document (a MemberProfile field name) for the single-section
+    routes: from the cached document when there is one, otherwise only that section is loaded and cached.
+    Raises ValueError when the member has no profile (general_info).
+    """
+    profile = profile_cache.get(member_id)
+    if profile is not None:
+        return getattr(profile, section)
+
+    key = (member_id, section)
+    value = profile_cache.get(key)
+    if value is None:
+        loaders = {
+            "general_info": get_member_general_info,
+            "contact_info": load_contact_info_section,
+            "education_info": get_member_education_info,
+            "youtube_channel": get_youtube_channel,
+            "instagram_url": get_instagram_url,
+        }
+        generation = profile_cache.generation()
+        value = await loaders[section](db, member_id)
+        profile_cache.set(key, value, generation=generation)
+    return value
+
+def invalidate_member_profile(member_id: int) -> None:
+    member_id = int(member_id)
+    profile_cache.pop(member_id)
+    for section in PROFILE_SECTIONS:
+        profile_cache.pop((member_id, section))
+
+#-----------------------------------------------------------------------------------
+
+async def get_member_profile(db: AsyncSession, member_id: int, viewer_id: Optional[int] = None) -> MemberProfile:
+    """
+    Loads everything a profile page shows: the cached profile document, plus whether viewer_id
+    is a contact / follower of the member (both from a single query, never cached).
+    Raises ValueError when the member has no profile.
+    """
+    profile = (await get_member_profile_document(db, member_id)).model_copy()
+
+    if viewer_id is not None:
+        relations = (await db.execute(text("""
+            SELECT
+                EXISTS (SELECT 1 FROM public.tbcontacts WHERE member_id = :viewer_id AND contact_id = :member_id) AS is_friend,
+                EXISTS (SELECT 1 FROM public.tbmemberfollowing WHERE member_id = :viewer_id AND following_member_id = :member_id) AS is_following
+        """), {"viewer_id": viewer_id, "member_id": member_id})).first()
+        profile.is_friend = relations.is_friend
+        profile.is_following = relations.is_following
+
+    return profile
+
+#-----------------------------------------------------------------------------------
+
+async def set_member_general_info(db: AsyncSession, data: GeneralInfo):
+    profile = await db.scalar(select(Tbmemberprofile).where(Tbmemberprofile.member_id == data.member_id))
 
     if profile:
         # Update existing
@@ -532,13 +761,14 @@ def set_member_general_info(db: Session, data: GeneralInfo):
         )
         db.add(profile)
 
-    db.commit()
+    await db.commit()
+    invalidate_member_profile(data.member_id)
 
 #-----------------------------------------------------------------------------------
 
-def set_member_contact_info(db: Session, data: Tbmemberprofilecontactinfo):
+async def set_member_contact_info(db: AsyncSession, data: Tbmemberprofilecontactinfo):
     # Try to fetch the existing record
-    contact = db.get(Tbmemberprofilecontactinfo, data.member_id)
+    contact = await db.get(Tbmemberprofilecontactinfo, data.member_id)
 
     if contact:
         # Update existing record
@@ -585,59 +815,58 @@ def set_member_contact_info(db: Session, data: Tbmemberprofilecontactinfo):
         )
         db.add(contact)
 
-    db.commit()
+    await db.commit()
+    invalidate_member_profile(data.member_id)
 
 #-----------------------------------------------------------------------------------
 
-def get_instagram_url(db: Session, member_id: int) -> str:
-    resp = (
-        db.query(Tbmemberprofilecontactinfo)
-        .filter(Tbmemberprofilecontactinfo.member_id == member_id)
-        .first()
+async def get_instagram_url(db: AsyncSession, member_id: int) -> str:
+    resp = await db.scalar(
+        select(Tbmemberprofilecontactinfo)
+        .where(Tbmemberprofilecontactinfo.member_id == member_id)
     )
 
     return resp.instagram if resp and resp.instagram else ""
 
 #-----------------------------------------------------------------------------------
 
-def set_instagram_url(db: Session, data:InstagramURL) -> None:
-    resp = (
-        db.query(Tbmemberprofilecontactinfo)
-        .filter(Tbmemberprofilecontactinfo.member_id == data.member_id)
-        .first()
+async def set_instagram_url(db: AsyncSession, data:InstagramURL) -> None:
+    resp = await db.scalar(
+        select(Tbmemberprofilecontactinfo)
+        .where(Tbmemberprofilecontactinfo.member_id == data.member_id)
     )
 
     if resp:
         resp.instagram = data.instagram_url
-        db.commit()
+        await db.commit()
+        invalidate_member_profile(data.member_id)
 
 #-----------------------------------------------------------------------------------
 
-def get_youtube_channel(db: Session, member_id: int) -> str:
-    resp = (
-        db.query(Tbmembers)
-        .filter(Tbmembers.member_id == member_id)
-        .first()
+async def get_youtube_channel(db: AsyncSession, member_id: int) -> str:
+    resp = await db.scalar(
+        select(Tbmembers)
+        .where(Tbmembers.member_id == member_id)
     )
 
     return resp.youtube_channel if resp and resp.youtube_channel else ""
 
 #-----------------------------------------------------------------------------------
 
-def set_youtube_channel(db: Session, data:YoutubeChannel) -> None:
-    resp = (
-        db.query(Tbmembers)
-        .filter(Tbmembers.member_id == data.member_id)
-        .first()
+async def set_youtube_channel(db: AsyncSession, data:YoutubeChannel) -> None:
+    resp = await db.scalar(
+        select(Tbmembers)
+        .where(Tbmembers.member_id == data.member_id)
     )
 
     if resp:
         resp.youtube_channel = data.channel_id
-        db.commit()
+        await db.commit()
+        invalidate_member_profile(data.member_id)
 
 #-----------------------------------------------------------------------------------
 
-def add_member_school(member_id:int, db: Session, data:EducationInfo) -> None:
+async def add_member_school(member_id:int, db: AsyncSession, data:EducationInfo) -> None:
     mp = Tbmemberprofileeducationv2(
         member_id=member_id,
         school_id=data.school_id,
@@ -650,20 +879,20 @@ def add_member_school(member_id:int, db: Session, data:EducationInfo) -> None:
         sport_level_type=data.sport_level_type
     )
     db.add(mp)
-    db.commit()
+    await db.commit()
+    invalidate_member_profile(member_id)
 
 #-----------------------------------------------------------------------------------
 
-def update_member_school(member_id:int, db: Session,data: EducationInfo) -> None:
+async def update_member_school(member_id:int, db: AsyncSession,data: EducationInfo) -> None:
     # Query the record
-    mbr = (
-        db.query(Tbmemberprofileeducationv2)
-        .filter(
+    mbr = await db.scalar(
+        select(Tbmemberprofileeducationv2)
+        .where(
             Tbmemberprofileeducationv2.member_id == member_id,
             Tbmemberprofileeducationv2.school_id == data.school_id,
             Tbmemberprofileeducationv2.school_type == data.school_type
         )
-        .first()
     )
     # If found, update fields
     if mbr:
@@ -672,22 +901,23 @@ def update_member_school(member_id:int, db: Session,data: EducationInfo) -> None
         mbr.degree_type = data.degree_type_id
         mbr.societies = ""
         mbr.sport_level_type = data.sport_level_type
-        db.commit()
+        await db.commit()
+        invalidate_member_profile(member_id)
 
 #-----------------------------------------------------------------------------------
 
-def set_remove_school(db: Session, member_id: int, inst_id: int, inst_type: int) -> None:
+async def set_remove_school(db: AsyncSession, member_id: int, inst_id: int, inst_type: int) -> None:
     # Query the specific school record
-    school_record = (
-        db.query(Tbmemberprofileeducationv2)
-        .filter(
+    school_record = await db.scalar(
+        select(Tbmemberprofileeducationv2)
+        .where(
             Tbmemberprofileeducationv2.member_id == member_id,
             Tbmemberprofileeducationv2.school_id == inst_id,
             Tbmemberprofileeducationv2.school_type == inst_type
         )
-        .first()
     )
     # If record exists, delete it
     if school_record:
-        db.delete(school_record)
-        db.commit()
+        await db.delete(school_record)
+        await db.commit()
+        invalidate_member_profile(member_id)
@@ -9,6 +9,8 @@ from typing import Optional
 from pytest import Session
 from sqlalchemy import text
 from sqlalchemy.orm import aliased
+from app.auth.revocation import token_revocations
+from app.crud.member import invalidate_member_profile
 from app.db.models.sp_db_models import Tbmemberprofile, Tbmembers, Tbmembersprivacysettings, Tbnotificationsettings
 from app.schemas.setting import MemberNameInfo, NotificationsSetting, PrivacySearchSettings
 from app.utils.crypto import encrypt
@@ -88,6 +90,7 @@ def set_update_name_info(db:Session, member_id:int, first_name:str, middle_name:
         mem.first_name = first_name
         mem.middle_name = middle_name
         db.commit()
+        invalidate_member_profile(member_id)
     else:
         raise ValueError(f"Member with ID {member_id} not found.")
 
@@ -154,7 +157,11 @@ def set_deactivate_account(db:Session, member_id:int, reason:int, explanation:st
        q.deactivate_reason = reason
        q.deactivate_explanation = explanation
        q.future_emails = future_email
+       if q.email:
+           token_revocations.revoke(db, q.email)  # signs the member out everywhere
        db.commit()
+       if q.email:
+           token_revocations.remember(q.email)
     else:
         raise ValueError(f"Deactivate Account for ID {member_id} not found.")  
 
@@ -0,0 +1,185 @@
+# app/crud/timeline.py
+# This module maintains the materialized home timeline (tbmembertimeline) behind the member feed:
+    # * Fanning a new post out to the author and every member who has the author as a contact
+    #   (fan_out_ctes lets create_member_post do this in the statement that reads the new post back)
+    # * Trimming each timeline to TIMELINE_MAX_LENGTH rows
+    # * Leaving out authors with more than TIMELINE_READ_FANOUT_THRESHOLD followers, their posts are merged in on read
+    # * Rebuilding a member's timeline when their contact list changes
+    # * Reading a page of a member's timeline with keyset pagination
+    # * None of these functions commit; callers commit together with the write that triggered them.
+    # * The writers take a sync Session (contact changes), the feed read takes the async one (member feed).
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import exists, select, text, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+from app.core.config import settings
+from app.utils.cursor import seek_before, sort_date
+from app.db.models.sp_db_models import Tbcontacts, Tbmemberposts, Tbmemberprofile, Tbmembertimeline, Tbtimelinereadauthors
+
+#-----------------------------------------------------------------------------------
+
+def fan_out_ctes(source: str) -> str:
+    # Returns the CTEs that push a new post into the author's timeline and the timelines of the
+    # members following the author, then trim those timelines. `source` names a CTE producing
+    # the new post's (post_id, post_date, member_id); bind fan_out_params() alongside.
+    # Authors with more than TIMELINE_READ_FANOUT_THRESHOLD followers only write their own timeline
+    # and are recorded in tbtimelinereadauthors, get_timeline_posts merges their posts in on read.
+    # The trim probes each timeline's index for its TIMELINE_MAX_LENGTH-th row and deletes from there
+    # down, so timelines under the limit cost one short index scan and nothing is sorted.
+    # The DELETE runs against the snapshot taken before the INSERT, so it keeps
+    # TIMELINE_MAX_LENGTH - 1 existing rows and the new post makes the total TIMELINE_MAX_LENGTH.
+    return f"""
+    author AS (
+        SELECT src.post_id, src.post_date, src.member_id,
+               EXISTS (
+                   SELECT 1 FROM public.tbcontacts c
+                   WHERE c.contact_id = src.member_id
+                   OFFSET :read_fanout_threshold
+               ) AS read_fanout
+        FROM {source} src
+    ),
+    read_author AS (
+        INSERT INTO public.tbtimelinereadauthors (member_id)
+        SELECT member_id FROM author WHERE read_fanout
+        ON CONFLICT DO NOTHING
+    ),
+    fan AS (
+        INSERT INTO public.tbmembertimeline (member_id, post_id, post_date)
+        SELECT r.member_id, a.post_id, a.post_date
+        FROM author a
+        CROSS JOIN LATERAL (
+            SELECT a.member_id
+            UNION
+            SELECT c.member_id FROM public.tbcontacts c WHERE c.contact_id = a.member_id AND NOT a.read_fanout
+        ) r
+        ON CONFLICT DO NOTHING
+        RETURNING member_id
+    ),
+    trimmed AS (
+        DELETE FROM public.tbmembertimeline t
+        USING (
+            SELECT f.member_id, last_kept.post_date, last_kept.post_id
+            FROM fan f
+            CROSS JOIN LATERAL (
+                SELECT tl.post_date, tl.post_id
+                FROM public.tbmembertimeline tl
+                WHERE tl.member_id = f.member_id
+                ORDER BY coalesce(tl.post_date, '-infinity'::timestamp) DESC, tl.post_id DESC
+                OFFSET (:max_length - 1)
+                LIMIT 1
+            ) last_kept
+        ) cut
+        WHERE t.member_id = cut.member_id
+          AND (coalesce(t.post_date, '-infinity'::timestamp), t.post_id)
+              <= (coalesce(cut.post_date, '-infinity'::timestamp), cut.post_id)
+    )
+    """
+
+def fan_out_params() -> dict:
+    return {
+        "max_length": settings.TIMELINE_MAX_LENGTH,
+        "read_fanout_threshold": settings.TIMELINE_READ_FANOUT_THRESHOLD
+    }
+
+def fan_out_post_to_timelines(db: Session, post_id: int) -> None:
+    # Fans out an existing post, e.g. one created outside create_member_post.
+    sql = text(f"""
+        WITH src AS (
+            SELECT post_id, post_date, member_id FROM public.tbmemberposts WHERE post_id = :post_id
+        ),
+        {fan_out_ctes("src")}
+        SELECT count(*) FROM fan
+    """)
+    db.execute(sql, {"post_id": post_id, **fan_out_params()})
+
+#-----------------------------------------------------------------------------------
+
+def rebuild_member_timeline(db: Session, member_id: int) -> None:
+    # Re-materializes a member's timeline from their own and their contacts' latest posts.
+    # Called when contacts are added or removed so the timeline matches the new contact list.
+    db.execute(text("""
+        DELETE FROM public.tbmembertimeline WHERE member_id = :member_id
+    """), {"member_id": member_id})
+
+    db.execute(text("""
+        INSERT INTO public.tbmembertimeline (member_id, post_id, post_date)
+        SELECT :member_id, p.post_id, p.post_date
+        FROM public.tbmemberposts p
+        WHERE p.member_id = :member_id
+           OR p.member_id IN (SELECT c.contact_id FROM public.tbcontacts c WHERE c.member_id = :member_id)
+        ORDER BY coalesce(p.post_date, '-infinity'::timestamp) DESC, p.post_id DESC
+        LIMIT :max_length
+    """), {"member_id": member_id, "max_length": settings.TIMELINE_MAX_LENGTH})
+
+#-----------------------------------------------------------------------------------
+
+async def get_timeline_posts(db: AsyncSession, member_id: int, limit: int, cursor: Optional[Tuple[datetime, int]] = None) -> List:
+    # One indexed range scan over the member's timeline, merged with the latest posts of the contacts
+    # listed in tbtimelinereadauthors (not fanned out, see fan_out_ctes), joined to the posts and author profiles.
+    # Rows have the same columns as the fan-out-on-read feed query in app/crud/member.py.
+    timeline_entries = (
+        select(Tbmembertimeline.post_id, Tbmembertimeline.post_date)
+        .where(Tbmembertimeline.member_id == member_id)
+    )
+    read_author_ids = (
+        select(Tbcontacts.contact_id)
+        .join(Tbtimelinereadauthors, Tbtimelinereadauthors.member_id == Tbcontacts.contact_id)
+        .where(Tbcontacts.member_id == member_id)
+    )
+    read_author_entries = (
+        select(Tbmemberposts.post_id, Tbmemberposts.post_date)
+        .where(Tbmemberposts.member_id.in_(read_author_ids))
+    )
+
+    if cursor:
+        timeline_entries = timeline_entries.where(seek_before(Tbmembertimeline.post_date, Tbmembertimeline.post_id, cursor))
+        read_author_entries = read_author_entries.where(seek_before(Tbmemberposts.post_date, Tbmemberposts.post_id, cursor))
+
+    # UNION drops the posts that are in both, e.g. from before the author crossed the threshold
+    entries = union(
+        timeline_entries.order_by(sort_date(Tbmembertimeline.post_date).desc(), Tbmembertimeline.post_id.desc()).limit(limit),
+        read_author_entries.order_by(sort_date(Tbmemberposts.post_date).desc(), Tbmemberposts.post_id.desc()).limit(limit)
+    ).subquery("entries")
+
+    post_alias = aliased(Tbmemberposts)
+    profile_alias = aliased(Tbmemberprofile)
+
+    query = (
+        select(
+            post_alias.post_id,
+            post_alias.title,
+            post_alias.description,
+            post_alias.post_date,
+            post_alias.attach_file,
+            post_alias.member_id,
+            profile_alias.picture_path,
+            profile_alias.first_name,
+            profile_alias.last_name,
+            post_alias.like_counter
+        )
+        .select_from(entries)
+        .join(post_alias, entries.c.post_id == post_alias.post_id)
+        .join(profile_alias, post_alias.member_id == profile_alias.member_id)
+    )
+
+    result = await db.execute(
+        query
+        .order_by(sort_date(entries.c.post_date).desc(), entries.c.post_id.desc())
+        .limit(limit)
+    )
+    return result.all()
+
+#-----------------------------------------------------------------------------------
+
+async def is_timeline_trimmed(db: AsyncSession, member_id: int) -> bool:
+    # True when the member's timeline is at TIMELINE_MAX_LENGTH rows, i.e. older posts may have been
+    # trimmed off its end. Probes for a row at that offset instead of counting the timeline.
+    position = (
+        select(Tbmembertimeline.post_id)
+        .where(Tbmembertimeline.member_id == member_id)
+        .offset(settings.TIMELINE_MAX_LENGTH - 1)
+        .limit(1)
+    )
+    return bool(await db.scalar(select(exists(position))))
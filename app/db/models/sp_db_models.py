@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, ForeignKeyConstraint, Identity, Integer, Numeric, PrimaryKeyConstraint, REAL, String, Table, Text, UniqueConstraint
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, ForeignKeyConstraint, Identity, Index, Integer, MetaData, Numeric, PrimaryKeyConstraint, REAL, String, Table, Text, UniqueConstraint, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 import datetime
 import decimal
@@ -672,3 +672,46 @@ class Tbmemberpostresponses(Base):
 
     member: Mapped[Optional['Tbmembers']] = relationship('Tbmembers', back_populates='tbmemberpostresponses')
     post: Mapped[Optional['Tbmemberposts']] = relationship('Tbmemberposts', back_populates='tbmemberpostresponses')
+
+
+class Tbmembertimeline(Base):
+    __tablename__ = 'tbmembertimeline'
+    __table_args__ = (
+        ForeignKeyConstraint(['member_id'], ['public.tbmembers.member_id'], ondelete='CASCADE', name='fk_tbmembertimeline_tbmembers'),
+        ForeignKeyConstraint(['post_id'], ['public.tbmemberposts.post_id'], ondelete='CASCADE', name='fk_tbmembertimeline_tbmemberposts'),
+        PrimaryKeyConstraint('member_id', 'post_id', name='tbmembertimeline_pkey'),
+        Index('ix_tbmembertimeline_member_sort_date_id', 'member_id', text("coalesce(post_date, '-infinity'::timestamp) DESC"), text('post_id DESC')),
+        {'schema': 'public'}
+    )
+
+    member_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    post_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    post_date: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime)
+
+
+class Tbtimelinereadauthors(Base):
+    __tablename__ = 'tbtimelinereadauthors'
+    __table_args__ = (
+        ForeignKeyConstraint(['member_id'], ['public.tbmembers.member_id'], ondelete='CASCADE', name='fk_tbtimelinereadauthors_tbmembers'),
+        PrimaryKeyConstraint('member_id', name='tbtimelinereadauthors_pkey'),
+        {'schema': 'public'}
+    )
+
+    member_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+
+# Views, created by the app/db/sql scripts. Kept out of Base.metadata so create_all doesn't make them tables.
+view_metadata = MetaData()
+
+# materialized view, see app/db/sql/006_school_dim.sql
+t_school_dim = Table(
+    'school_dim', view_metadata,
+    Column('school_type', BigInteger, nullable=False),
+    Column('school_id', BigInteger, nullable=False),
+    Column('name', String),
+    Column('address', String),
+    Column('image', String),
+    Column('state', String),
+    Index('ux_school_dim_type_id', 'school_type', 'school_id', unique=True),
+    schema='public'
+)
@@ -0,0 +1,91 @@
+# app/db/pool.py
+# Connection pools that record how long requests wait for a connection:
+    # * TimedQueuePool - QueuePool for the sync engine
+    # * TimedAsyncQueuePool - AsyncAdaptedQueuePool for the async (asyncpg) engine
+    # * pool_metrics() reports size, checked-out and overflow connections plus the wait stats,
+    #   so pool exhaustion shows up before requests start failing with pool timeouts.
+
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolWaitStats:
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class TimedPoolMixin:
+    # Times every checkout from the pool queue, including the time spent opening a new connection.
+    # recreate() (engine.dispose()) builds a new pool, which keeps the same stats object.
+
+    wait_stats: PoolWaitStats
+
+    def __init__(self, *args, wait_stats: PoolWaitStats = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = wait_stats or PoolWaitStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+#-----------------------------------------------------------------------------------
+
+def pool_metrics(pool: Pool) -> Dict[str, Any]:
+    metrics: Dict[str, Any] = {"status": pool.status()}
+    if isinstance(pool, QueuePool):
+        metrics.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),   # negative while the pool is still filling up
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    if isinstance(pool, TimedPoolMixin):
+        metrics.update(pool.wait_stats.snapshot())
+    return metrics
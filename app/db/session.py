@@ -1,12 +1,128 @@
+import base64
+import itertools
+import json
+import logging
+import threading
+import time
+from typing import Any, List, Optional
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.core.config import settings
+from app.db.pool import TimedAsyncQueuePool, TimedQueuePool
+from app.utils.cache import LRUCache
 
-engine = create_engine(settings.DATABASE_URL)
+# Two engines on purpose: the async engine serves the member routes (app/crud/member.py, the feed and
+# profile pages that carry most of the traffic). The other CRUD modules, the background workers
+# (like buffer, token revocations, email outbox, reference data refresh) and the app/tools commands run
+# in threads and stay on the sync engine. Each engine's pool is sized separately, see app/core/config.py.
+
+def get_pool_options(use_async: bool = False) -> dict:
+    return {
+        "pool_size": settings.ASYNC_DB_POOL_SIZE if use_async else settings.DB_POOL_SIZE,
+        "max_overflow": settings.ASYNC_DB_MAX_OVERFLOW if use_async else settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+engine = create_engine(settings.DATABASE_URL, poolclass=TimedQueuePool, **get_pool_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Async engine (asyncpg) for the async routes. Defaults to DATABASE_URL with the asyncpg driver.
+
+def get_async_database_url(url: str) -> str:
+    url = make_url(url)
+    query = dict(url.query)
+    # asyncpg takes ssl= instead of libpq's sslmode= and does not know channel_binding
+    sslmode = query.pop("sslmode", None)
+    query.pop("channel_binding", None)
+    if sslmode:
+        query["ssl"] = sslmode
+    return url.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL),
+    poolclass=TimedAsyncQueuePool,
+    **get_pool_options(use_async=True)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Read replicas. GET endpoints that can tolerate replication lag take get_read_db / get_async_read_db,
+# which hand out a session on the next healthy replica (round-robin) and fall back to the primary.
+
+class ReplicaSet:
+    # Round-robin over replica engines with passive health checks: a replica that fails to give a
+    # connection is skipped for REPLICA_RETRY_SECONDS, then tried again.
+
+    def __init__(self, engines: List[Any], retry_after: float):
+        self.engines = engines
+        self._retry_after = retry_after
+        self._down_until = {}                 # engine index -> monotonic time it is retried
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List[Any]:
+        # healthy replicas in round-robin order
+        if not self.engines:
+            return []
+        start = next(self._turn) % len(self.engines)
+        now = time.monotonic()
+        with self._lock:
+            order = [(start + i) % len(self.engines) for i in range(len(self.engines))]
+            return [self.engines[i] for i in order if self._down_until.get(i, 0) <= now]
+
+    def mark_down(self, engine: Any, error: Exception) -> None:
+        logging.warning(f"Read replica {engine.url.render_as_string()} unavailable, skipped for {self._retry_after}s: {error}")
+        with self._lock:
+            self._down_until[self.engines.index(engine)] = time.monotonic() + self._retry_after
+
+replica_urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+replicas = ReplicaSet(
+    [create_engine(url, poolclass=TimedQueuePool, **get_pool_options()) for url in replica_urls],
+    settings.REPLICA_RETRY_SECONDS
+)
+async_replicas = ReplicaSet(
+    [create_async_engine(get_async_database_url(url), poolclass=TimedAsyncQueuePool, **get_pool_options(use_async=True)) for url in replica_urls],
+    settings.REPLICA_RETRY_SECONDS
+)
+
+# Read-your-writes: after a member sends a write request, their reads go to the primary for
+# READ_YOUR_WRITES_SECONDS. Members are told apart by the sub claim of their bearer token, so a
+# token refreshed right after a write still reads from the primary.
+recent_writers = LRUCache(maxsize=100000, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+def get_writer_key(request: Request) -> Optional[str]:
+    # The claims are read without verifying the signature: the key only picks the database a read
+    # goes to, get_current_user still rejects invalid tokens.
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or token.count(".") != 2:
+        return None
+    try:
+        payload = token.split(".")[1]
+        sub = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))).get("sub")
+    except (ValueError, AttributeError):
+        return None
+    return str(sub) if sub is not None else None
+
+def reads_from_primary(request: Request) -> bool:
+    key = get_writer_key(request)
+    return key is not None and recent_writers.get(key) is not None
+
+async def read_your_writes_middleware(request: Request, call_next):
+    key = get_writer_key(request) if request.method not in ("GET", "HEAD", "OPTIONS") else None
+    if key:
+        recent_writers.set(key, True)
+    response = await call_next(request)
+    if key:
+        recent_writers.set(key, True)   # the window starts again once the write has committed
+    return response
+
 # Dependency for FastAPI routes
 
 def get_db():
@@ -15,4 +131,41 @@ def get_db():
         yield db
     finally:
         db.close()
-        
\ No newline at end of file
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db(request: Request):
+    if not reads_from_primary(request):
+        for replica in replicas.candidates():
+            try:
+                conn = replica.connect()
+            except (DBAPIError, PoolTimeoutError, OSError) as e:
+                replicas.mark_down(replica, e)
+                continue
+            db = Session(bind=conn, autoflush=False)
+            try:
+                yield db
+            finally:
+                db.close()
+                conn.close()
+            return
+    yield from get_db()
+
+async def get_async_read_db(request: Request):
+    if not reads_from_primary(request):
+        for replica in async_replicas.candidates():
+            try:
+                conn = await replica.connect()
+            except (DBAPIError, PoolTimeoutError, OSError) as e:
+                async_replicas.mark_down(replica, e)
+                continue
+            try:
+                async with AsyncSession(bind=conn, autoflush=False, expire_on_commit=False) as db:
+                    yield db
+            finally:
+                await conn.close()
+            return
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,7 @@
+-- app/db/sql/001_member_posts_feed_index.sql
+-- Supports keyset pagination of the member feed (get_recent_posts):
+-- WHERE member_id IN (...) AND (post_date, post_id) < (:date, :id) ORDER BY post_date DESC, post_id DESC
+-- Replaced by the NULL-safe index of 012_keyset_null_dates.sql.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tbmemberposts_member_date_id
+    ON public.tbmemberposts (member_id, post_date DESC, post_id DESC);
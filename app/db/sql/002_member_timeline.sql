@@ -0,0 +1,24 @@
+-- app/db/sql/002_member_timeline.sql
+-- Materialized per-member home timeline (fan-out-on-write), filled by app/crud/timeline.py.
+-- Each member keeps at most TIMELINE_MAX_LENGTH rows; older pages fall back to fan-out-on-read.
+-- Existing members' timelines are filled by 009_member_timeline_backfill.sql.
+
+CREATE TABLE IF NOT EXISTS public.tbmembertimeline (
+    member_id  BIGINT NOT NULL,
+    post_id    BIGINT NOT NULL,
+    post_date  TIMESTAMP,
+    CONSTRAINT tbmembertimeline_pkey PRIMARY KEY (member_id, post_id),
+    CONSTRAINT fk_tbmembertimeline_tbmembers FOREIGN KEY (member_id)
+        REFERENCES public.tbmembers (member_id) ON DELETE CASCADE,
+    CONSTRAINT fk_tbmembertimeline_tbmemberposts FOREIGN KEY (post_id)
+        REFERENCES public.tbmemberposts (post_id) ON DELETE CASCADE
+);
+
+-- feed reads: WHERE member_id = :m AND (post_date, post_id) < (:date, :id) ORDER BY post_date DESC, post_id DESC
+-- (replaced by the NULL-safe index of 012_keyset_null_dates.sql)
+CREATE INDEX IF NOT EXISTS ix_tbmembertimeline_member_date_id
+    ON public.tbmembertimeline (member_id, post_date DESC, post_id DESC);
+
+-- fan-out looks up who has the author as a contact
+CREATE INDEX IF NOT EXISTS ix_tbcontacts_contact_id
+    ON public.tbcontacts (contact_id);
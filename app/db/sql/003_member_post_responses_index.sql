@@ -0,0 +1,8 @@
+-- app/db/sql/003_member_post_responses_index.sql
+-- Supports keyset pagination of comment threads (get_recent_post_responses) and the grouped
+-- comment counts of the member feed:
+-- WHERE post_id = :p AND (response_date, post_response_id) < (:date, :id) ORDER BY response_date DESC, post_response_id DESC
+-- Replaced by the NULL-safe index of 012_keyset_null_dates.sql.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tbmemberpostresponses_post_date_id
+    ON public.tbmemberpostresponses (post_id, response_date DESC, post_response_id DESC);
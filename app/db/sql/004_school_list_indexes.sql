@@ -0,0 +1,14 @@
+-- app/db/sql/004_school_list_indexes.sql
+-- Covering indexes for the narrow school list queries (get_schools_by_state / get_schools_by_type):
+-- SELECT DISTINCT id, name FROM <table> WHERE state = :state ORDER BY name
+-- lets Postgres answer them with index-only scans instead of reading the wide rows.
+-- Superseded by school_dim (006_school_dim.sql), dropped again by 011_drop_school_list_indexes.sql.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tbpublicschools_state_name
+    ON public.tbpublicschools (state, school_name) INCLUDE (lgid);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tbprivateschools_state_name
+    ON public.tbprivateschools (state, school_name) INCLUDE (lg_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tbcolleges_state_name
+    ON public.tbcolleges (state, name) INCLUDE (school_id);
@@ -0,0 +1,6 @@
+-- app/db/sql/005_public_school_lgid_index.sql
+-- tbpublicschools has no key, so without this index the education lookup in
+-- get_member_education_info (ps.lgid = e.school_id) scans the table for every public school a member lists.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tbpublicschools_lgid
+    ON public.tbpublicschools (lgid);
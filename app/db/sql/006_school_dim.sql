@@ -0,0 +1,34 @@
+-- app/db/sql/006_school_dim.sql
+-- One row per school across the three school tables, keyed by (school_type, school_id):
+-- 1 = tbpublicschools (lgid), 2 = tbprivateschools (lg_id), 3 = tbcolleges (school_id).
+-- Used by the education lookup and the school lists. Refresh after changing the school tables:
+-- python -m app.tools.refresh_school_dim (app.tools.load_schools rebuilds it on its own).
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.school_dim AS
+    SELECT school_type, school_id, name, address, image, state
+    FROM (
+        -- tbpublicschools has no key on lgid, keep one row per lgid
+        SELECT DISTINCT ON (p.lgid)
+            1::bigint AS school_type,
+            p.lgid AS school_id,
+            p.school_name::varchar AS name,
+            (p.street_name || ', ' || p.city || ', ' || p.state || ' ' || p.zip)::varchar AS address,
+            'default.png'::varchar AS image,
+            p.state::varchar AS state
+        FROM public.tbpublicschools p
+        ORDER BY p.lgid
+    ) public_schools
+    UNION ALL
+    SELECT 2, p.lg_id, p.school_name, p.school_name, 'default.png', p.state
+    FROM public.tbprivateschools p
+    UNION ALL
+    SELECT 3, c.school_id, c.name, c.address, c.website, c.state
+    FROM public.tbcolleges c;
+
+-- required by REFRESH MATERIALIZED VIEW CONCURRENTLY, and the education lookup probe
+CREATE UNIQUE INDEX IF NOT EXISTS ux_school_dim_type_id
+    ON public.school_dim (school_type, school_id);
+
+-- school lists: WHERE school_type = :type AND state = :state ORDER BY name
+CREATE INDEX IF NOT EXISTS ix_school_dim_type_state_name
+    ON public.school_dim (school_type, state, name) INCLUDE (school_id);
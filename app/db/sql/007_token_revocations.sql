@@ -0,0 +1,15 @@
+-- app/db/sql/007_token_revocations.sql
+-- Token revocations (app/auth/revocation.py). A row revokes every token of the subject (the
+-- member's email, the JWT sub claim) issued at or before revoked_at. Rows are only appended;
+-- API instances load new rows incrementally by revoked_at into an in-memory Bloom filter.
+
+CREATE TABLE IF NOT EXISTS public.tbtokenrevocations (
+    revocation_id  BIGINT GENERATED ALWAYS AS IDENTITY,
+    subject        VARCHAR(150) NOT NULL,
+    revoked_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CONSTRAINT tbtokenrevocations_pkey PRIMARY KEY (revocation_id)
+);
+
+-- confirms Bloom filter hits: SELECT max(revoked_at) ... WHERE subject = :subject
+CREATE INDEX IF NOT EXISTS ix_tbtokenrevocations_subject
+    ON public.tbtokenrevocations (subject, revoked_at);
@@ -0,0 +1,25 @@
+-- app/db/sql/008_email_outbox.sql
+-- Transactional email outbox, filled by app/crud/email_outbox.py in the same transaction as the
+-- change that triggers the email (registration, password reset) and drained by the outbox worker.
+-- status: 0 = pending, 1 = sent, 2 = failed (gave up after EMAIL_OUTBOX_MAX_ATTEMPTS)
+
+CREATE TABLE IF NOT EXISTS public.tbemailoutbox (
+    email_id         BIGINT GENERATED ALWAYS AS IDENTITY,
+    member_name      VARCHAR(150),
+    to_email         VARCHAR(150) NOT NULL,
+    subject          VARCHAR(250) NOT NULL,
+    body             TEXT NOT NULL,
+    is_body_html     BOOLEAN NOT NULL DEFAULT TRUE,
+    status           SMALLINT NOT NULL DEFAULT 0,
+    attempts         INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_error       TEXT,
+    created_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+    sent_at          TIMESTAMPTZ,
+    CONSTRAINT tbemailoutbox_pkey PRIMARY KEY (email_id)
+);
+
+-- the worker claims: WHERE status = 0 AND next_attempt_at <= now() ORDER BY next_attempt_at ... SKIP LOCKED
+CREATE INDEX IF NOT EXISTS ix_tbemailoutbox_pending
+    ON public.tbemailoutbox (next_attempt_at)
+    WHERE status = 0;
@@ -0,0 +1,19 @@
+-- app/db/sql/009_member_timeline_backfill.sql
+-- Fills tbmembertimeline (002_member_timeline.sql) for every member from their own and their
+-- contacts' latest posts, the same rows rebuild_member_timeline writes. The feed only builds pages
+-- on read past the end of a trimmed timeline, so an empty timeline is an empty feed: run this right
+-- after deploying the API version that writes timelines. Safe to run again, existing rows are kept.
+-- 800 = TIMELINE_MAX_LENGTH, change both together.
+
+INSERT INTO public.tbmembertimeline (member_id, post_id, post_date)
+SELECT m.member_id, p.post_id, p.post_date
+FROM public.tbmembers m
+CROSS JOIN LATERAL (
+    SELECT p.post_id, p.post_date
+    FROM public.tbmemberposts p
+    WHERE p.member_id = m.member_id
+       OR p.member_id IN (SELECT c.contact_id FROM public.tbcontacts c WHERE c.member_id = m.member_id)
+    ORDER BY coalesce(p.post_date, '-infinity'::timestamp) DESC, p.post_id DESC
+    LIMIT 800
+) p
+ON CONFLICT DO NOTHING;
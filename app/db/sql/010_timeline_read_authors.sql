@@ -0,0 +1,12 @@
+-- app/db/sql/010_timeline_read_authors.sql
+-- Authors whose posts are not fanned out to their followers' timelines because they had more than
+-- TIMELINE_READ_FANOUT_THRESHOLD followers when they posted (app/crud/timeline.py). Timeline reads
+-- merge in these authors' posts from tbmemberposts. Rows are only added: an author who drops below
+-- the threshold is fanned out again, and the posts made meanwhile are still found through this table.
+
+CREATE TABLE IF NOT EXISTS public.tbtimelinereadauthors (
+    member_id  BIGINT NOT NULL,
+    CONSTRAINT tbtimelinereadauthors_pkey PRIMARY KEY (member_id),
+    CONSTRAINT fk_tbtimelinereadauthors_tbmembers FOREIGN KEY (member_id)
+        REFERENCES public.tbmembers (member_id) ON DELETE CASCADE
+);
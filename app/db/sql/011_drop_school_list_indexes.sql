@@ -0,0 +1,10 @@
+-- app/db/sql/011_drop_school_list_indexes.sql
+-- Drops the covering indexes of 004_school_list_indexes.sql. The school lists they served are read
+-- from school_dim (006_school_dim.sql, ix_school_dim_type_state_name) since then, and no other query
+-- filters the school tables by state, so they only slowed down writes and the load_schools swaps.
+
+DROP INDEX CONCURRENTLY IF EXISTS public.ix_tbpublicschools_state_name;
+
+DROP INDEX CONCURRENTLY IF EXISTS public.ix_tbprivateschools_state_name;
+
+DROP INDEX CONCURRENTLY IF EXISTS public.ix_tbcolleges_state_name;
@@ -0,0 +1,22 @@
+-- app/db/sql/012_keyset_null_dates.sql
+-- Keyset pagination sorts NULL dates as -infinity (sort_date in app/utils/cursor.py), so rows without
+-- a date come last and a cursor taken on one still finds the rows after it. The feed, timeline and
+-- comment thread indexes are rebuilt on that expression:
+-- WHERE ... AND (coalesce(date, '-infinity'), id) < (coalesce(:date, '-infinity'), :id)
+-- ORDER BY coalesce(date, '-infinity') DESC, id DESC
+-- They replace the indexes of 001, 002 and 003, which the queries no longer use.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tbmemberposts_member_sort_date_id
+    ON public.tbmemberposts (member_id, (coalesce(post_date, '-infinity'::timestamp)) DESC, post_id DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS public.ix_tbmemberposts_member_date_id;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tbmembertimeline_member_sort_date_id
+    ON public.tbmembertimeline (member_id, (coalesce(post_date, '-infinity'::timestamp)) DESC, post_id DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS public.ix_tbmembertimeline_member_date_id;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tbmemberpostresponses_post_sort_date_id
+    ON public.tbmemberpostresponses (post_id, (coalesce(response_date, '-infinity'::timestamp)) DESC, post_response_id DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS public.ix_tbmemberpostresponses_post_date_id;
@@ -20,7 +20,17 @@ from fastapi import FastAPI, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.openapi.utils import get_openapi
 
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from app.auth.revocation import token_revocations
 from app.api.routes import account, common, contact, member, message, setting
+from app.core.config import settings
+from app.crud.common import warm_reference_data, warm_school_index
+from app.crud.email_outbox import email_outbox
+from app.crud.like_buffer import like_buffer
+from app.db.session import async_engine, read_your_writes_middleware
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
@@ -52,8 +62,40 @@ tags_metadata = [
     },
 ]
 
+def preload_school_index():
+    try:
+        warm_school_index()
+    except Exception as e:
+        logging.error(f"Failed to preload school index: {e}")  # built on first request instead
+
+
+# starts background workers on startup and drains them on shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await asyncio.to_thread(warm_reference_data)
+    except Exception as e:
+        logging.error(f"Failed to preload reference data: {e}")  # loaded on first request instead
+    if settings.SCHOOL_INDEX_PRELOAD:
+        # large, so built in the background while the app starts serving
+        threading.Thread(target=preload_school_index, name="school-index-preload", daemon=True).start()
+    if settings.LIKE_BUFFER_ENABLED:
+        like_buffer.start()
+    await asyncio.to_thread(token_revocations.start)  # initial load, then refreshed in the background
+    if settings.EMAIL_OUTBOX_WORKER_ENABLED:
+        email_outbox.start()
+    yield
+    if settings.EMAIL_OUTBOX_WORKER_ENABLED:
+        email_outbox.stop()  # unsent emails stay queued
+    token_revocations.stop()
+    if settings.LIKE_BUFFER_ENABLED:
+        like_buffer.stop()  # flushes buffered like counts
+    await async_engine.dispose()
+
+
 # define the API application instance  - starting point to the app.
 app = FastAPI(
+    lifespan=lifespan,
     title="Sport Profles API",
     description="""RESTful API web service for the Sports Profile (SP) social networking application.<br/><br/>
 Author: <b>Marc Manuel</b> (https://www.linkedin.com/in/marc-manuel-b298326/)<br/><br/>
@@ -107,6 +149,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# sends a member's reads to the primary database for a few seconds after they write
+app.middleware("http")(read_your_writes_middleware)
+
 #define autentication methods using OAuth2 with JWT bearer tokens
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 bearer_scheme = HTTPBearer()
@@ -1,8 +1,18 @@
 # app/schemas/member.py
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
+class PostResponses(BaseModel):
+    post_response_id : Optional[int] = None
+    post_id  :Optional[int] = None
+    description: Optional[str] = None
+    date_responded: Optional[str] = None
+    member_id: Optional[int] = None
+    member_name: Optional[str] = None
+    first_name: Optional[str] = None
+    picture_path: Optional[str] = None
+
 class Posts(BaseModel):
     post_id: Optional[int] = None
     title: Optional[str] = None
@@ -15,16 +25,15 @@ class Posts(BaseModel):
     first_name: Optional[str] = None
     child_post_count: Optional[str] = None
     like_counter :Optional[int] = None
+    comments: Optional[List[PostResponses]] = None    # latest comments, only when the feed is asked to include them
 
-class PostResponses(BaseModel):
-    post_response_id : Optional[int] = None
-    post_id  :Optional[int] = None
-    description: Optional[str] = None
-    date_responded: Optional[str] = None
-    member_id: Optional[int] = None
-    member_name: Optional[str] = None
-    first_name: Optional[str] = None
-    picture_path: Optional[str] = None
+class PostsPage(BaseModel):
+    posts: List[Posts] = []
+    next_cursor: Optional[str] = None    # None when there are no more pages
+
+class PostResponsesPage(BaseModel):
+    post_responses: List[PostResponses] = []
+    next_cursor: Optional[str] = None    # None when there are no more pages
 
 class GeneralInfo (BaseModel):
     member_id: Optional[str] = None
@@ -123,7 +132,13 @@ class InstagramURL(BaseModel):
 
 class YoutubeChannel(BaseModel):
     member_id : Optional[int] = None 
-    channel_id  : Optional[str] = None 
-
-
-
+    channel_id  : Optional[str] = None
+
+class MemberProfile(BaseModel):
+    general_info: GeneralInfo
+    contact_info: Optional[ContactInfo] = None
+    education_info: List[EducationInfo] = []
+    youtube_channel: str = ""
+    instagram_url: str = ""
+    is_friend: Optional[bool] = None        # relations of viewer_id to the member, None when no viewer is given
+    is_following: Optional[bool] = None
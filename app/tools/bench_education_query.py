@@ -0,0 +1,99 @@
+# app/tools/bench_education_query.py
+# Compares the query plans of the education lookup before and after the school_dim rewrite:
+    # * Runs EXPLAIN (ANALYZE, BUFFERS) of both queries for each member given
+    # * Prints execution time and shared buffer hits/reads per version
+# Pick members with many schools listed to see the difference.
+#
+# Usage:
+#   python -m app.tools.bench_education_query 12 345 678 [--runs 5] [--verbose]
+
+import argparse
+import json
+import statistics
+from typing import List
+from sqlalchemy import text
+from app.crud.member import EDUCATION_INFO_SQL
+from app.db.session import SessionLocal
+
+# the original version, with one correlated scalar subquery per column and school type
+CORRELATED_EDUCATION_INFO_SQL = """
+    SELECT e.member_id, e.school_id, e.school_type, e.class_year, e.major, e.degree_type,
+         e.societies, e.description,
+         d.degree_type_desc, e.sport_level_type, s.school_type_desc,
+
+        (case e.school_type when 3  then
+            (select name from public.tbcolleges c where c.school_id=e.school_id)
+            when 2 then
+                (select school_name  from public.tbprivateschools p  where p.lg_id = e.school_id)
+            when 1 then
+                (select school_name  from public.tbpublicschools p  where p.lgid = e.school_id)
+            end ) as school_name,
+
+        (case e.school_type when 3  then
+            (Select address From public.tbcolleges c  where c.school_id=e.school_id)
+                when 2 then
+                (select school_name  from public.tbprivateschools p where p.lg_id = e.school_id)
+            when 1 then
+                (select street_name || ', ' || city || ', ' || state || ' ' || zip
+                 from public.tbpublicschools p where p.lgid = e.school_id)
+            end ) as address,
+
+        (case e.school_type when 3  then
+            (Select c.website From public.tbcolleges c  where c.school_id=e.school_id)
+            else
+                'default.png'
+            end ) as file_image
+
+            FROM public.tbmemberprofileeducationv2 e
+            left JOIN public.tbdegreetype d on e.degree_type = d.degree_type_id
+            left JOIN public.tbschooltype s on e.school_type = s.school_type_id where member_id = :member_id
+            Order by class_year desc
+"""
+
+QUERIES = {
+    "correlated": CORRELATED_EDUCATION_INFO_SQL,
+    "school_dim": EDUCATION_INFO_SQL,
+}
+
+#-----------------------------------------------------------------------------------
+
+def explain(db, sql: str, member_id: int) -> dict:
+    result = db.execute(text("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql), {"member_id": member_id})
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]
+
+#-----------------------------------------------------------------------------------
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE the old and new education queries.")
+    parser.add_argument("member_ids", type=int, nargs="+")
+    parser.add_argument("--runs", type=int, default=5, help="runs per query, the first one warms the cache")
+    parser.add_argument("--verbose", action="store_true", help="print the full plan of the last run")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        for member_id in args.member_ids:
+            rows = db.execute(text("SELECT count(*) FROM public.tbmemberprofileeducationv2 WHERE member_id = :member_id"),
+                              {"member_id": member_id}).scalar()
+            print(f"member {member_id} ({rows} schools)")
+            for name, sql in QUERIES.items():
+                timings = []
+                for _ in range(args.runs):
+                    plan = explain(db, sql, member_id)
+                    timings.append(plan["Execution Time"])
+                top = plan["Plan"]
+                hits = top.get("Shared Hit Blocks", 0)
+                reads = top.get("Shared Read Blocks", 0)
+                print(f"  {name:<10} median {statistics.median(timings[1:] or timings):8.3f} ms"
+                      f"  buffers hit={hits} read={reads}")
+                if args.verbose:
+                    print(json.dumps(plan["Plan"], indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
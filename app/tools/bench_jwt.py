@@ -0,0 +1,84 @@
+# app/tools/bench_jwt.py
+# Microbenchmarks for the JWT backends of app/auth/tokens.py:
+    # * encode and decode throughput (operations per second on one core) of every installed backend
+    # * a compatibility check: every backend must verify the tokens of every other backend
+    #   and reject tampered and expired tokens
+# Pick the winner with the JWT_BACKEND setting.
+#
+# Usage:
+#   python -m app.tools.bench_jwt [--iterations 20000] [--backends jose pyjwt hmac]
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from app.auth.tokens import TOKEN_BACKENDS, TokenError, TokenService
+from app.core.config import settings
+
+#-----------------------------------------------------------------------------------
+
+def ops_per_second(func: Callable[[], object], iterations: int) -> float:
+    for _ in range(min(iterations, 1000)):   # warm up
+        func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+def sample_claims() -> Dict:
+    return {"sub": "michael.jordan@outlook.com", "exp": datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)}
+
+#-----------------------------------------------------------------------------------
+
+def check_compatibility(services: Dict[str, TokenService]) -> List[str]:
+    problems = []
+    for issuer_name, issuer in services.items():
+        token = issuer.encode(sample_claims())
+        expired = issuer.encode({"sub": "x", "exp": datetime.utcnow() - timedelta(seconds=5)})
+        header, payload, signature = token.split(".")
+        tampered = ".".join([header, payload, ("A" if signature[0] != "A" else "B") + signature[1:]])
+        for verifier_name, verifier in services.items():
+            pair = f"{issuer_name} -> {verifier_name}"
+            if verifier.decode(token).get("sub") != "michael.jordan@outlook.com":
+                problems.append(f"{pair}: valid token not accepted")
+            for label, bad_token in (("tampered", tampered), ("expired", expired)):
+                try:
+                    verifier.decode(bad_token)
+                    problems.append(f"{pair}: {label} token accepted")
+                except TokenError:
+                    pass
+    return problems
+
+#-----------------------------------------------------------------------------------
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the JWT backends.")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--backends", nargs="+", default=list(TOKEN_BACKENDS), choices=list(TOKEN_BACKENDS))
+    args = parser.parse_args(argv)
+
+    services: Dict[str, TokenService] = {}
+    for name in args.backends:
+        try:
+            services[name] = TokenService(name, settings.SECRET_KEY, settings.ALGORITHM)
+        except (ImportError, ValueError) as e:
+            print(f"{name:<6} skipped: {e}")
+
+    problems = check_compatibility(services)
+    for problem in problems:
+        print(f"INCOMPATIBLE {problem}")
+    if not problems:
+        print(f"compatibility: ok ({', '.join(services)})")
+
+    print(f"{'backend':<8}{'encode/s':>12}{'decode/s':>12}")
+    for name, service in services.items():
+        claims = sample_claims()
+        token = service.encode(claims)
+        encode_rate = ops_per_second(lambda: service.encode(claims), args.iterations)
+        decode_rate = ops_per_second(lambda: service.decode(token), args.iterations)
+        marker = "  (current JWT_BACKEND)" if name == settings.JWT_BACKEND else ""
+        print(f"{name:<8}{encode_rate:>12,.0f}{decode_rate:>12,.0f}{marker}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# app/tools/bench_login.py
+# Login throughput on one core:
+    # * token issuance only - create_access_token + create_refresh_token (two claim sets, two clocks)
+    #   against issue_token_pair, for every installed JWT backend
+    # * optionally the whole validate_user call (password check query + token pair) against the database
+#
+# Usage:
+#   python -m app.tools.bench_login [--iterations 20000] [--email michael.jordan@outlook.com --password 123456 --db-iterations 200]
+
+import argparse
+import time
+from typing import Callable, List
+import app.utils.jwt as jwt_utils
+from app.auth.tokens import TOKEN_BACKENDS, TokenService
+from app.core.config import settings
+
+#-----------------------------------------------------------------------------------
+
+def logins_per_second(func: Callable[[], object], iterations: int) -> float:
+    func()  # warm up
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+def separate_tokens() -> None:
+    jwt_utils.create_access_token({"sub": "michael.jordan@outlook.com"})
+    jwt_utils.create_refresh_token({"sub": "michael.jordan@outlook.com"})
+
+def token_pair() -> None:
+    jwt_utils.issue_token_pair({"sub": "michael.jordan@outlook.com"})
+
+#-----------------------------------------------------------------------------------
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the login token issuance path.")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--email", help="member to log in with for the end-to-end validate_user benchmark")
+    parser.add_argument("--password")
+    parser.add_argument("--db-iterations", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{'backend':<8}{'separate/s':>13}{'pair/s':>11}{'speedup':>9}")
+    default_service = jwt_utils.token_service
+    for name in TOKEN_BACKENDS:
+        try:
+            jwt_utils.token_service = TokenService(name, settings.SECRET_KEY, settings.ALGORITHM)
+        except (ImportError, ValueError) as e:
+            print(f"{name:<8} skipped: {e}")
+            continue
+        separate = logins_per_second(separate_tokens, args.iterations)
+        pair = logins_per_second(token_pair, args.iterations)
+        print(f"{name:<8}{separate:>13,.0f}{pair:>11,.0f}{pair / separate:>8.2f}x")
+    jwt_utils.token_service = default_service
+
+    if args.email:
+        from app.crud.account import validate_user
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            rate = logins_per_second(lambda: validate_user(db, args.email, args.password), args.db_iterations)
+        finally:
+            db.close()
+        print(f"validate_user ({settings.JWT_BACKEND}): {rate:,.0f} logins/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# app/tools/load_schools.py
+# Command line loader for the school reference tables (government datasets refreshed yearly):
+    # * Streams each CSV file into a staging copy of its table with COPY, in chunks
+    # * Swaps the staging table in for the live one in one short transaction (renames only)
+    # * Builds the school_dim materialized view on the staging tables beforehand, and renames it in with them
+    # * Keeps the GRANTs and the index, constraint and sequence names of the tables it replaces
+    # * Optionally asks a running API instance to rebuild its school caches
+# Readers keep using the live table while the data loads; the swap only needs a brief lock.
+#
+# Usage:
+#   python -m app.tools.load_schools --public public.csv --private private.csv --colleges colleges.csv
+#       [--chunk-size 50000] [--notify-url https://host/api/common/cache/invalidate --token <SERVICE_TOKEN>]
+#
+# The first line of each CSV must be a header naming the table columns it contains.
+
+import argparse
+import csv
+import io
+import logging
+import re
+import sys
+import time
+from typing import Dict, Iterator, List, Tuple
+import requests
+from psycopg2 import sql
+from app.core.config import settings
+from app.db.session import engine
+
+SCHOOL_TABLES = {
+    "public": "tbpublicschools",
+    "private": "tbprivateschools",
+    "colleges": "tbcolleges",
+}
+
+#-----------------------------------------------------------------------------------
+
+def read_chunks(csv_file, chunk_size: int) -> Iterator[io.StringIO]:
+    # Re-encodes the rows as CSV so quoted fields with embedded newlines never split across chunks
+    reader = csv.reader(csv_file)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows = 0
+    for row in reader:
+        writer.writerow(row)
+        rows += 1
+        if rows == chunk_size:
+            buffer.seek(0)
+            yield buffer
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            rows = 0
+    if rows:
+        buffer.seek(0)
+        yield buffer
+
+#-----------------------------------------------------------------------------------
+
+def get_table_columns(cursor, table: str) -> List[str]:
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_schema = 'public' AND table_name = %s",
+        (table,)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+#-----------------------------------------------------------------------------------
+
+def load_staging_table(conn, table: str, path: str, chunk_size: int) -> int:
+    """
+    Creates public.<table>_staging like the live table and COPYs the CSV into it.
+    Returns the number of rows loaded.
+    """
+    staging = f"{table}_staging"
+    with conn.cursor() as cursor:
+        # CASCADE drops the school_dim_staging a failed earlier run may have left on it
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS public.{} CASCADE").format(sql.Identifier(staging)))
+        cursor.execute(sql.SQL("CREATE TABLE public.{} (LIKE public.{} INCLUDING ALL)").format(
+            sql.Identifier(staging), sql.Identifier(table)))
+
+        with open(path, newline="", encoding="utf-8") as csv_file:
+            header = next(csv.reader(csv_file))
+            unknown = set(header) - set(get_table_columns(cursor, table))
+            if unknown:
+                raise ValueError(f"{path}: columns not in {table}: {', '.join(sorted(unknown))}")
+
+            copy = sql.SQL("COPY public.{} ({}) FROM STDIN WITH (FORMAT csv)").format(
+                sql.Identifier(staging), sql.SQL(", ").join(sql.Identifier(col) for col in header))
+            for chunk in read_chunks(csv_file, chunk_size):
+                cursor.copy_expert(copy.as_string(conn), chunk)
+
+        # COPY writes identity columns as given, so move their sequences past the loaded ids
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = 'public' AND table_name = %s AND is_identity = 'YES'",
+            (staging,)
+        )
+        for (column,) in cursor.fetchall():
+            cursor.execute(sql.SQL(
+                "SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE((SELECT max({}) FROM public.{}), 0) + 1, false)"
+            ).format(sql.Identifier(column), sql.Identifier(staging)), (f"public.{staging}", column))
+
+        cursor.execute(sql.SQL("ANALYZE public.{}").format(sql.Identifier(staging)))
+        cursor.execute(sql.SQL("SELECT count(*) FROM public.{}").format(sql.Identifier(staging)))
+        loaded = cursor.fetchone()[0]
+    conn.commit()
+    return loaded
+
+#-----------------------------------------------------------------------------------
+
+def get_index_names(cursor, table: str) -> Dict[Tuple, Tuple[str, str]]:
+    # {(primary, unique, definition after USING): (index name, constraint name or None)}.
+    # The key leaves out the index and table names, so it matches a table's indexes with
+    # the ones CREATE TABLE ... LIKE copied to its staging table.
+    cursor.execute("""
+        SELECT x.indisprimary, x.indisunique, regexp_replace(pg_get_indexdef(x.indexrelid), '^.*? USING ', ''),
+               i.relname, c.conname
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        LEFT JOIN pg_constraint c ON c.conindid = x.indexrelid AND c.conrelid = x.indrelid
+        WHERE x.indrelid = %s::regclass
+    """, (f"public.{table}",))
+    return {(primary, unique, definition): (name, constraint) for primary, unique, definition, name, constraint in cursor.fetchall()}
+
+def get_sequence_names(cursor, table: str) -> Dict[str, str]:
+    # {column: name of the serial / identity sequence it owns}
+    cursor.execute("""
+        SELECT a.attname, s.relname
+        FROM pg_attribute a
+        JOIN pg_class s ON s.oid = pg_get_serial_sequence(%s, a.attname)::regclass
+        WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+    """, (f"public.{table}", f"public.{table}"))
+    return dict(cursor.fetchall())
+
+def get_grant_statements(cursor, table: str, target: str) -> List[sql.Composed]:
+    # The GRANTs on table, as statements for target (the staging table does not inherit them)
+    cursor.execute("""
+        SELECT CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE pg_get_userbyid(a.grantee) END, a.privilege_type, a.is_grantable
+        FROM pg_class c, aclexplode(c.relacl) a
+        WHERE c.oid = %s::regclass AND a.grantee <> c.relowner
+    """, (f"public.{table}",))
+    statements = []
+    for grantee, privilege, grantable in cursor.fetchall():
+        statements.append(sql.SQL("GRANT {} ON public.{} TO {}{}").format(
+            sql.SQL(privilege),
+            sql.Identifier(target),
+            sql.SQL("PUBLIC") if grantee == "PUBLIC" else sql.Identifier(grantee),
+            sql.SQL(" WITH GRANT OPTION") if grantable else sql.SQL("")
+        ))
+    return statements
+
+def restore_names(cursor, table: str, indexes: Dict[Tuple, Tuple[str, str]], sequences: Dict[str, str]) -> None:
+    # Gives the swapped-in table the index, constraint and sequence names of the table it replaced,
+    # so names don't pick up a _staging suffix (and then _staging1, ...) with every load.
+    for key, (name, constraint) in get_index_names(cursor, table).items():
+        if key not in indexes or indexes[key][0] == name:
+            continue
+        old_name, old_constraint = indexes[key]
+        if constraint and old_constraint:
+            # renaming the constraint renames its index too
+            cursor.execute(sql.SQL("ALTER TABLE public.{} RENAME CONSTRAINT {} TO {}").format(
+                sql.Identifier(table), sql.Identifier(constraint), sql.Identifier(old_constraint)))
+        else:
+            cursor.execute(sql.SQL("ALTER INDEX public.{} RENAME TO {}").format(sql.Identifier(name), sql.Identifier(old_name)))
+
+    for column, name in get_sequence_names(cursor, table).items():
+        if column in sequences and sequences[column] != name:
+            cursor.execute(sql.SQL("ALTER SEQUENCE public.{} RENAME TO {}").format(
+                sql.Identifier(name), sql.Identifier(sequences[column])))
+
+#-----------------------------------------------------------------------------------
+
+def build_school_dim_staging(conn, tables: List[str]) -> None:
+    """
+    Builds public.school_dim_staging from the school_dim definition, reading the staging copies of
+    the given tables and the live copies of the others, with the same indexes and GRANTs.
+    Runs before the swap and only reads the live tables, so readers are not blocked while it builds.
+    The view is bound to the staging tables themselves, not their names, so it keeps reading them
+    once swap_tables has renamed them.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("DROP MATERIALIZED VIEW IF EXISTS public.school_dim_staging")
+        cursor.execute("SELECT pg_get_viewdef('public.school_dim'::regclass)")
+        view_sql = cursor.fetchone()[0]
+        for table in tables:
+            view_sql = re.sub(rf"\b(public\.)?{table}\b", f"public.{table}_staging", view_sql)
+        cursor.execute("CREATE MATERIALIZED VIEW public.school_dim_staging AS " + view_sql)
+
+        for primary, unique, definition in get_index_names(cursor, "school_dim"):
+            cursor.execute(("CREATE UNIQUE INDEX" if unique else "CREATE INDEX")
+                           + " ON public.school_dim_staging USING " + definition)
+        for statement in get_grant_statements(cursor, "school_dim", "school_dim_staging"):
+            cursor.execute(statement)
+        cursor.execute("ANALYZE public.school_dim_staging")
+    conn.commit()
+
+#-----------------------------------------------------------------------------------
+
+def swap_tables(conn, tables: List[str]) -> None:
+    """
+    Replaces every live table with its staging table, and school_dim with school_dim_staging
+    (see build_school_dim_staging), in one transaction of drops and renames only, so readers see
+    either all the old data or all the new data and wait only for the brief locks. Fails (and changes
+    nothing) if another object still depends on an old table, or if the locks cannot be taken within 5 seconds.
+
+    The new tables get the GRANTs and the index, constraint and sequence names of the old ones.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("SET LOCAL lock_timeout = '5s'")
+        view_indexes = get_index_names(cursor, "school_dim")
+        cursor.execute("DROP MATERIALIZED VIEW public.school_dim")   # depends on the old tables
+
+        for table in tables:
+            old = f"{table}_old"
+            indexes = get_index_names(cursor, table)
+            sequences = get_sequence_names(cursor, table)
+            for statement in get_grant_statements(cursor, table, f"{table}_staging"):
+                cursor.execute(statement)
+
+            cursor.execute(sql.SQL("DROP TABLE IF EXISTS public.{}").format(sql.Identifier(old)))
+            cursor.execute(sql.SQL("ALTER TABLE public.{} RENAME TO {}").format(sql.Identifier(table), sql.Identifier(old)))
+            cursor.execute(sql.SQL("ALTER TABLE public.{} RENAME TO {}").format(sql.Identifier(f"{table}_staging"), sql.Identifier(table)))
+            cursor.execute(sql.SQL("DROP TABLE public.{}").format(sql.Identifier(old)))
+            restore_names(cursor, table, indexes, sequences)
+
+        cursor.execute("ALTER MATERIALIZED VIEW public.school_dim_staging RENAME TO school_dim")
+        restore_names(cursor, "school_dim", view_indexes, {})
+    conn.commit()
+
+#-----------------------------------------------------------------------------------
+
+def refresh_school_caches(notify_url: str = None, token: str = None) -> bool:
+    # The school index lives in the API processes, not in this one, so a running API is asked to
+    # rebuild it. Without --notify-url (or when the call fails) the API instances pick up the new
+    # data when their cached index expires (REFERENCE_CACHE_TTL_SECONDS). The data is already
+    # swapped in at this point, so a failure is reported but not treated as a failed load.
+    if not notify_url:
+        print(f"no --notify-url: running APIs reload the schools within {settings.REFERENCE_CACHE_TTL_SECONDS:.0f}s")
+        return True
+    token = token or settings.SERVICE_TOKEN
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    try:
+        response = requests.post(notify_url, params={"dataset": "schools"}, headers=headers, timeout=30)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logging.error(f"Data swapped in, but the API cache invalidation failed ({e}); "
+                      f"running APIs reload the schools within {settings.REFERENCE_CACHE_TTL_SECONDS:.0f}s")
+        return False
+    print("API school caches invalidated")
+    return True
+
+#-----------------------------------------------------------------------------------
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk load the school reference tables from CSV files.")
+    parser.add_argument("--public", help="CSV file for tbpublicschools")
+    parser.add_argument("--private", help="CSV file for tbprivateschools")
+    parser.add_argument("--colleges", help="CSV file for tbcolleges")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="rows sent per COPY chunk")
+    parser.add_argument("--notify-url", help="cache invalidation endpoint of a running API, e.g. https://host/api/common/cache/invalidate")
+    parser.add_argument("--token", help="service token (SERVICE_TOKEN) used to call --notify-url, defaults to the SERVICE_TOKEN setting")
+    args = parser.parse_args(argv)
+
+    files = {SCHOOL_TABLES[kind]: getattr(args, kind) for kind in SCHOOL_TABLES if getattr(args, kind)}
+    if not files:
+        parser.error("at least one of --public, --private or --colleges is required")
+
+    conn = engine.raw_connection()
+    try:
+        for table, path in files.items():
+            started = time.perf_counter()
+            loaded = load_staging_table(conn, table, path, args.chunk_size)
+            print(f"{table}: loaded {loaded} rows into staging in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        build_school_dim_staging(conn, list(files))
+        print(f"school_dim_staging built in {time.perf_counter() - started:.1f}s")
+
+        swap_tables(conn, list(files))
+        print(f"swapped in: {', '.join(files)}")
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"School load failed, live tables unchanged: {e}")
+        return 1
+    finally:
+        conn.close()
+
+    refresh_school_caches(args.notify_url, args.token)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+# app/tools/outbox_worker.py
+# Drains the email outbox (app/db/sql/008_email_outbox.sql) in its own process, for long-running deployments that
+# set EMAIL_OUTBOX_WORKER_ENABLED=false on the API instances. Several workers can run side by side,
+# rows are claimed with FOR UPDATE SKIP LOCKED.
+#
+# Usage:
+#   python -m app.tools.outbox_worker            # runs until interrupted
+#   python -m app.tools.outbox_worker --once     # sends what is due, then exits
+
+import argparse
+import logging
+import signal
+import sys
+from typing import List
+from app.crud.email_outbox import email_outbox
+
+#-----------------------------------------------------------------------------------
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Send the emails queued in the email outbox.")
+    parser.add_argument("--once", action="store_true", help="send the emails that are due and exit")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.once:
+        print(f"{email_outbox.drain()} emails processed")
+        return 0
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: email_outbox.stop())
+    email_outbox.run_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
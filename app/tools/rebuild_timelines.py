@@ -0,0 +1,47 @@
+# app/tools/rebuild_timelines.py
+# Materializes the home timeline (app/db/sql/002_member_timeline.sql) of every member, or of the given ones.
+# Deploys fill every timeline with app/db/sql/009_member_timeline_backfill.sql, run this for a subset of
+# members, or whenever timelines were changed outside the API.
+#
+# Usage:
+#   python -m app.tools.rebuild_timelines [--member-id 12 --member-id 34] [--batch-size 500]
+
+import argparse
+import logging
+import sys
+import time
+from typing import List
+from sqlalchemy import select
+from app.crud.timeline import rebuild_member_timeline
+from app.db.models.sp_db_models import Tbmembers
+from app.db.session import SessionLocal
+
+#-----------------------------------------------------------------------------------
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild member home timelines.")
+    parser.add_argument("--member-id", type=int, action="append", help="member to rebuild, repeatable (default: every member)")
+    parser.add_argument("--batch-size", type=int, default=500, help="members rebuilt per transaction")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        member_ids = args.member_id or db.scalars(select(Tbmembers.member_id).order_by(Tbmembers.member_id)).all()
+        started = time.perf_counter()
+        for i in range(0, len(member_ids), args.batch_size):
+            for member_id in member_ids[i:i + args.batch_size]:
+                rebuild_member_timeline(db, member_id)
+            db.commit()
+            print(f"{min(i + args.batch_size, len(member_ids))}/{len(member_ids)} timelines rebuilt")
+        print(f"done in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Timeline rebuild failed: {e}")
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+# app/tools/refresh_school_dim.py
+# Refreshes the school_dim materialized view (app/db/sql/006_school_dim.sql):
+    # * REFRESH ... CONCURRENTLY, so education lookups and school lists keep reading the old rows meanwhile
+    # * Then optionally asks a running API instance to rebuild its school caches
+# Run it after editing tbpublicschools, tbprivateschools or tbcolleges by hand
+# (app.tools.load_schools rebuilds the view itself).
+#
+# Usage:
+#   python -m app.tools.refresh_school_dim [--notify-url https://host/api/common/cache/invalidate --token <SERVICE_TOKEN>]
+
+import argparse
+import logging
+import sys
+import time
+from typing import List
+from app.db.session import engine
+from app.tools.load_schools import refresh_school_caches
+
+#-----------------------------------------------------------------------------------
+
+def refresh_school_dim(conn) -> None:
+    with conn.cursor() as cursor:
+        cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY public.school_dim")
+        cursor.execute("ANALYZE public.school_dim")
+    conn.commit()
+
+#-----------------------------------------------------------------------------------
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Refresh the school_dim materialized view.")
+    parser.add_argument("--notify-url", help="cache invalidation endpoint of a running API, e.g. https://host/api/common/cache/invalidate")
+    parser.add_argument("--token", help="service token (SERVICE_TOKEN) used to call --notify-url, defaults to the SERVICE_TOKEN setting")
+    args = parser.parse_args(argv)
+
+    conn = engine.raw_connection()
+    try:
+        started = time.perf_counter()
+        refresh_school_dim(conn)
+        print(f"school_dim refreshed in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"school_dim refresh failed: {e}")
+        return 1
+    finally:
+        conn.close()
+
+    refresh_school_caches(args.notify_url, args.token)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
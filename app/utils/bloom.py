@@ -0,0 +1,42 @@
+# app/utils/bloom.py
+# Fixed-size Bloom filter for fast "definitely not in the set" checks (token revocations, ...).
+    # * Sized from the expected number of items and the wanted false positive rate
+    # * k bit positions per item from double hashing of one blake2b digest
+    # * add() and might_contain() are O(k); items are never removed, rebuild the filter instead
+
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> None:
+        positions = self._positions(item)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def might_contain(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def is_full(self) -> bool:
+        # past capacity the false positive rate climbs above error_rate
+        return self.count > self.capacity
@@ -0,0 +1,175 @@
+# app/utils/cache.py
+# In-process caches shared by the CRUD layer:
+    # * LRUCache - thread-safe LRU with optional expiry for read-through caches (comment threads, ...).
+    #   Entries expire after the cache-wide ttl, or after a per-entry ttl passed to set().
+    #   Read-through fills pass the generation() taken before loading to set(), so a fill that
+    #   raced with a pop() of the same key does not put the stale value back.
+    #   Hit/miss counters are kept for monitoring.
+    # * ReferenceCache - versioned datasets of rarely changing reference data (states, sports, ...)
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class LRUCache:
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()   # key -> (expires_at, value)
+        self._generation = 0
+        self._popped: "OrderedDict[Hashable, int]" = OrderedDict()   # key -> generation of its last pop()
+        self._forgotten = 0   # newest generation dropped from _popped
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def generation(self) -> int:
+        # Take before loading a value to set() with generation=
+        with self._lock:
+            return self._generation
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, generation: Optional[int] = None) -> bool:
+        # Returns False (and stores nothing) when the key was popped after generation was taken
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if generation is not None and (self._popped.get(key, 0) > generation or self._forgotten > generation):
+                return False
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return True
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+            self._popped[key] = self._generation
+            self._popped.move_to_end(key)
+            while len(self._popped) > self.maxsize:
+                _, self._forgotten = self._popped.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+            self._popped.clear()
+            self._forgotten = self._generation   # fills started before the clear are dropped
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class CachedDataset:
+
+    def __init__(self, version: int, value: Any):
+        self.version = version
+        self.value = value
+        self.loaded_at = time.monotonic()
+        self.extras: Dict[str, Any] = {}   # values derived once per version (e.g. serialized payloads)
+
+
+class ReferenceCache:
+    # Named reference datasets (states, sports, ...) loaded by a loader(db) function, or by a
+    # loader(db, key) for keyed datasets such as the school lists of one (state, type).
+    # Every load gets a new version number. Stale datasets keep being served while one background
+    # thread reloads them, so requests only touch the database when a dataset was never loaded.
+
+    def __init__(self, session_factory: Callable[[], Any], ttl: float):
+        self._session_factory = session_factory
+        self._ttl = ttl
+        self._loaders: Dict[str, Callable[..., Any]] = {}
+        self._keyed: set = set()
+        self._datasets: Dict[Tuple[str, Hashable], CachedDataset] = {}
+        self._refreshing: set = set()
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[..., Any], keyed: bool = False) -> None:
+        self._loaders[name] = loader
+        if keyed:
+            self._keyed.add(name)
+
+    def get_dataset(self, name: str, db: Any = None, key: Hashable = None) -> CachedDataset:
+        dataset = self._datasets.get((name, key))
+        if dataset is None:
+            return self._load(name, key, db)
+        if time.monotonic() - dataset.loaded_at > self._ttl:
+            self._refresh_in_background(name, key)
+        return dataset
+
+    def get(self, name: str, db: Any = None, key: Hashable = None) -> Any:
+        return self.get_dataset(name, db, key).value
+
+    def put(self, name: str, value: Any, key: Hashable = None) -> CachedDataset:
+        # Stores a dataset loaded elsewhere, e.g. many keyed datasets built from one bulk query
+        with self._lock:
+            self._version += 1
+            dataset = CachedDataset(self._version, value)
+            self._datasets[(name, key)] = dataset
+        return dataset
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        # Drops one dataset (all keys of it) or all of them; the next request reloads them.
+        with self._lock:
+            if name is None:
+                self._datasets.clear()
+            else:
+                for dataset_key in [k for k in self._datasets if k[0] == name]:
+                    del self._datasets[dataset_key]
+
+    def warm(self, db: Any = None) -> None:
+        # Loads every dataset that is not keyed
+        for name in self._loaders:
+            if name not in self._keyed:
+                self._load(name, None, db)
+
+    def _load(self, name: str, key: Hashable = None, db: Any = None) -> CachedDataset:
+        own_session = db is None
+        if own_session:
+            db = self._session_factory()
+        try:
+            loader = self._loaders[name]
+            value = loader(db, key) if name in self._keyed else loader(db)
+        finally:
+            if own_session:
+                db.close()
+        return self.put(name, value, key)
+
+    def _refresh_in_background(self, name: str, key: Hashable = None) -> None:
+        with self._lock:
+            if (name, key) in self._refreshing:
+                return
+            self._refreshing.add((name, key))
+
+        def refresh():
+            try:
+                self._load(name, key)
+            except Exception as e:
+                logging.error(f"Failed to refresh reference data '{name}' {key or ''}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard((name, key))
+
+        threading.Thread(target=refresh, name=f"refresh-{name}", daemon=True).start()
@@ -0,0 +1,42 @@
+# app/utils/cursor.py
+# Opaque cursors for keyset (seek) pagination.
+# A cursor is the sort key of the last row a client has seen, e.g. (post_date, post_id), packed
+# into a url-safe base64 string so clients treat it as a token and never build one themselves.
+# Sort dates may be NULL. Queries order and seek on sort_date(column), which maps NULL to -infinity,
+# so those rows come last in newest-first order and a cursor taken on one still finds the rows after it.
+# The indexes are built on the same expression (app/db/sql/012_keyset_null_dates.sql).
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import DateTime, func, literal, literal_column, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+NEGATIVE_INFINITY = literal_column("'-infinity'::timestamp")
+
+
+def encode_cursor(sort_date: Optional[datetime], row_id: int) -> str:
+    payload = json.dumps([sort_date.isoformat() if sort_date else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("utf-8").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    # Raises ValueError when the cursor was not produced by encode_cursor.
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_date, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("utf-8")))
+        return (datetime.fromisoformat(sort_date) if sort_date else None, int(row_id))
+    except Exception:
+        raise ValueError("Invalid pagination cursor.")
+
+
+def sort_date(column) -> ColumnElement:
+    # The date a row sorts on: NULL dates as -infinity, older than every real date
+    return func.coalesce(column, NEGATIVE_INFINITY)
+
+
+def seek_before(date_column, id_column, cursor: Tuple[Optional[datetime], int]) -> ColumnElement:
+    # Rows after the cursor in (sort_date(date_column) DESC, id_column DESC) order
+    cursor_date, cursor_id = cursor
+    return tuple_(sort_date(date_column), id_column) < tuple_(sort_date(literal(cursor_date, DateTime())), cursor_id)
@@ -1,4 +1,7 @@
 # app/utils/email.py
+# SMTP delivery. Application code doesn't call this directly: emails are queued with
+# email_outbox.enqueue (app/crud/email_outbox.py) and sent by the outbox worker, which
+# sends each batch over one connection and retries failures.
 
 import smtplib
 from email.mime.text import MIMEText
@@ -8,33 +11,42 @@ from app.core.config import settings  # Assuming settings come from pydantic Bas
 import logging
 
 
-def send_email(member_name: str, from_email: str, to_email: str, subject: str, body: str, is_body_html: bool = True):
+def build_message(member_name: str, to_email: str, subject: str, body: str, is_body_html: bool = True) -> MIMEMultipart:
+    # Get sender name and default email if not provided
+    name = member_name or settings.APP_ADMIN
+    from_email = settings.APP_FROM_EMAIL
+
+    # Compose the email
+    msg = MIMEMultipart()
+    msg['From'] = formataddr((name, from_email))
+    msg['To'] = to_email
+    msg['Subject'] = subject
+
+    # Attach HTML or plain body
+    mime_type = 'html' if is_body_html else 'plain'
+    msg.attach(MIMEText(body, mime_type))
+    return msg
+
+
+def open_smtp() -> smtplib.SMTP:
+    # Connected, STARTTLS and logged in. Use as a context manager so the connection is closed.
+    smtp_host = settings.APP_SMTP_HOST
+    smtp_port = int(settings.APP_SMTP_PORT or 587)
+    smtp_password = settings.APP_SMTP_PWD
+
+    server = smtplib.SMTP(smtp_host, smtp_port, timeout=settings.APP_SMTP_TIMEOUT_SECONDS)
     try:
-        # Get sender name and default email if not provided
-        name = member_name or settings.APP_ADMIN
-        from_email = settings.APP_FROM_EMAIL
-
-        # Compose the email
-        msg = MIMEMultipart()
-        msg['From'] = formataddr((name, from_email))
-        msg['To'] = to_email
-        msg['Subject'] = subject
-
-        # Attach HTML or plain body
-        mime_type = 'html' if is_body_html else 'plain'
-        msg.attach(MIMEText(body, mime_type))
-
-        # SMTP configuration
-        smtp_host = settings.APP_SMTP_HOST
-        smtp_port = int(settings.APP_SMTP_PORT or 587)
-        smtp_password = settings.APP_SMTP_PWD
-
-        # Send the email
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.starttls()
-            server.login(from_email, smtp_password)
-            server.send_message(msg)
-
-        logging.info(f"Email sent to {to_email}")
-    except Exception as e:
-        logging.error(f"Failed to send email: {e}")
\ No newline at end of file
+        server.starttls()
+        server.login(settings.APP_FROM_EMAIL, smtp_password)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def send_email(member_name: str, from_email: str, to_email: str, subject: str, body: str, is_body_html: bool = True):
+    # Sends one email right away. Raises on failure, the caller decides whether to retry.
+    msg = build_message(member_name, to_email, subject, body, is_body_html)
+    with open_smtp() as server:
+        server.send_message(msg)
+    logging.info(f"Email sent to {to_email}")
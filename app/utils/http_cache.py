@@ -0,0 +1,50 @@
+# app/utils/http_cache.py
+# HTTP conditional caching helpers for read-mostly endpoints:
+    # * Strong ETags derived from the serialized JSON body
+    # * 304 Not Modified when the client's If-None-Match matches
+    # * Cache-Control on every cacheable response (private: the endpoints are authenticated,
+    #   shared caches must not store them)
+# For reference data the serialized body and its ETag are computed once per dataset version
+# and kept on the CachedDataset, so repeated requests neither re-serialize nor re-hash.
+
+import hashlib
+import json
+from typing import Any
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+from app.utils.cache import CachedDataset
+
+
+def serialize_json(value: Any) -> bytes:
+    return json.dumps(jsonable_encoder(value), separators=(",", ":")).encode("utf-8")
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    # If-None-Match may hold several tags, weak tags (W/"...") or "*"
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def conditional_json_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": settings.REFERENCE_CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cached_json_response(request: Request, dataset: CachedDataset, key: str, value: Any) -> Response:
+    # `key` names the slice of the dataset being returned (e.g. the ads of one type)
+    cached = dataset.extras.get(key)
+    if cached is None:
+        body = serialize_json(value)
+        cached = (body, etag_for(body))
+        dataset.extras[key] = cached
+    return conditional_json_response(request, *cached)
@@ -1,9 +1,9 @@
 # app/utils/jwt.py
 
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
 from dotenv import load_dotenv
 import os
+from app.auth.tokens import token_service
 from app.core.config import settings
 
 # Load from .env
@@ -13,14 +13,16 @@ load_dotenv()
 SECRET_KEY = settings.SECRET_KEY #os.getenv("SECRET_KEY", "your-secret-key")
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES  # 1 hour
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
 def create_access_token(data: dict, expires_delta: timedelta = None) -> dict:
     to_encode = data.copy()
 
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": expire, "iat": now})
 
-    token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    token = token_service.encode(to_encode)
 
     return {
         "access_token": token,
@@ -29,13 +31,29 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> dict:
 
 
 def create_refresh_token(data: dict, expires_delta: timedelta = None) -> dict:
-    expire = datetime.utcnow() + (expires_delta or timedelta(days=7))  # refresh token lasts 7 days
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
     to_encode = data.copy()
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": now})
 
-    token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    token = token_service.encode(to_encode)
 
     return {
         "refresh_token": token,
         "expire_date": expire.isoformat()
     }
+
+
+def issue_token_pair(data: dict, access_expires_delta: timedelta = None, refresh_expires_delta: timedelta = None) -> dict:
+    # Login path: builds the claims once and signs the access and refresh tokens with the same issue time.
+    now = datetime.utcnow()
+    access_expire = now + (access_expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    refresh_expire = now + (refresh_expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+    access_token, refresh_token = token_service.encode_expiring({**data, "iat": now}, [access_expire, refresh_expire])
+
+    return {
+        "access_token": access_token,
+        "expire_date": access_expire.isoformat(),
+        "refresh_token": refresh_token,
+        "refresh_expire_date": refresh_expire.isoformat()
+    }
@@ -0,0 +1,61 @@
+# app/utils/prefix_index.py
+# Sorted in-memory index for typeahead search over names (e.g. the schools of one state).
+# Lookups are binary searches, so a prefix query costs O(log n + k) however long the list is.
+    # * Names starting with the prefix come first, in alphabetical order
+    # * Then names with a later word starting with the prefix ("lincoln" finds "Abraham Lincoln High")
+    # * Matching is case-insensitive
+
+from bisect import bisect_left
+from typing import Generic, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class PrefixIndex(Generic[T]):
+
+    def __init__(self, entries: Sequence[Tuple[str, T]]):
+        # entries are (name, item) pairs; items are returned by all() in name order
+        ordered = sorted(entries, key=lambda entry: entry[0].casefold())
+        self._items: List[T] = [item for _, item in ordered]
+        self._names: List[str] = [name.casefold() for name, _ in ordered]
+
+        # (text from a later word to the end of the name, position in _items)
+        words = []
+        for position, name in enumerate(self._names):
+            for start in range(1, len(name)):
+                if name[start - 1] == " " and name[start] != " ":
+                    words.append((name[start:], position))
+        words.sort()
+        self._word_keys: List[str] = [key for key, _ in words]
+        self._word_positions: List[int] = [position for _, position in words]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def all(self) -> List[T]:
+        return list(self._items)
+
+    def search(self, prefix: str, limit: int) -> List[T]:
+        prefix = prefix.casefold().strip()
+        if not prefix:
+            return self._items[:limit]
+
+        found: List[int] = []
+        i = bisect_left(self._names, prefix)
+        while i < len(self._names) and len(found) < limit and self._names[i].startswith(prefix):
+            found.append(i)
+            i += 1
+
+        if len(found) < limit:
+            seen = set(found)
+            later = []
+            i = bisect_left(self._word_keys, prefix)
+            while i < len(self._word_keys) and len(seen) < limit and self._word_keys[i].startswith(prefix):
+                position = self._word_positions[i]
+                if position not in seen:
+                    seen.add(position)
+                    later.append(position)
+                i += 1
+            found.extend(sorted(later))
+
+        return [self._items[position] for position in found]
@@ -0,0 +1,76 @@
+# tests/test_like_buffer.py
+# Unit tests for the write-behind like counter (app/crud/like_buffer.py) with a fake session:
+# increments are coalesced per post, flushed as one batch, and kept when the flush fails.
+
+from app.crud.like_buffer import LikeCounterBuffer
+
+
+class FakeSession:
+
+    def __init__(self, batches, fail=False):
+        self.batches = batches
+        self.fail = fail
+
+    def execute(self, statement, params):
+        self.params = params
+
+    def commit(self):
+        if self.fail:
+            raise RuntimeError("connection lost")
+        self.batches.append(dict(zip(self.params["post_ids"], self.params["amounts"])))
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def build_buffer(batches, fail=lambda: False, threshold=100):
+    return LikeCounterBuffer(lambda: FakeSession(batches, fail()), flush_interval=60, flush_threshold=threshold)
+
+#-----------------------------------------------------------------------------------
+
+def test_increments_are_coalesced_into_one_batch():
+    batches = []
+    buffer = build_buffer(batches)
+    buffer.increment(1)
+    buffer.increment(1)
+    buffer.increment(2, 3)
+    assert buffer.buffered_count(1) == 2
+    assert buffer.flush() == 2
+    assert batches == [{1: 2, 2: 3}]
+    assert buffer.buffered_count(1) == 0
+    assert buffer.flush() == 0
+
+
+def test_failed_flush_keeps_the_increments():
+    batches = []
+    failing = [True]
+    buffer = build_buffer(batches, fail=lambda: failing[0])
+    buffer.increment(1)
+    assert buffer.flush() == 0
+    assert buffer.buffered_count(1) == 1
+    buffer.increment(1)
+    failing[0] = False
+    assert buffer.flush() == 1
+    assert batches == [{1: 2}]
+
+
+def test_threshold_does_not_flush_on_the_caller():
+    # the request path only wakes the worker, nothing is written until flush() runs
+    batches = []
+    buffer = build_buffer(batches, threshold=2)
+    buffer.increment(1)
+    buffer.increment(1)
+    assert batches == []
+    assert buffer.buffered_count(1) == 2
+
+
+def test_stop_flushes_what_is_left():
+    batches = []
+    buffer = build_buffer(batches)
+    buffer.start()
+    buffer.increment(5)
+    buffer.stop()
+    assert batches == [{5: 1}]
@@ -0,0 +1,88 @@
+# tests/test_tokens.py
+# Unit tests for the JWT backends in app/auth/tokens.py, chiefly the hand-rolled HmacBackend:
+# it must accept what it issues, reject tampered or expired tokens, and interoperate with jose and PyJWT.
+
+import time
+import pytest
+from app.auth.tokens import HmacBackend, JoseBackend, PyJWTBackend, TokenError, TokenService
+
+SECRET = "test-secret-of-at-least-32-bytes!"
+
+#-----------------------------------------------------------------------------------
+
+def test_hmac_round_trip():
+    backend = HmacBackend(SECRET, "HS256")
+    claims = {"sub": "member@example.com", "iat": 1700000000, "exp": int(time.time()) + 60}
+    assert backend.decode(backend.encode(claims)) == claims
+
+
+def test_hmac_encode_expiring_shares_claims():
+    backend = HmacBackend(SECRET, "HS256")
+    now = int(time.time())
+    access, refresh = backend.encode_expiring({"sub": "member@example.com", "iat": now}, [now + 60, now + 120])
+    assert backend.decode(access) == {"sub": "member@example.com", "iat": now, "exp": now + 60}
+    assert backend.decode(refresh)["exp"] == now + 120
+
+
+def test_hmac_encode_expiring_without_other_claims():
+    backend = HmacBackend(SECRET, "HS256")
+    exp = int(time.time()) + 60
+    assert backend.decode(backend.encode_expiring({}, [exp])[0]) == {"exp": exp}
+
+
+def test_hmac_rejects_other_algorithms():
+    with pytest.raises(ValueError):
+        HmacBackend(SECRET, "RS256")
+
+
+@pytest.mark.parametrize("mangle", [
+    lambda token: token[:-2] + ("AA" if not token.endswith("AA") else "BB"),   # signature
+    lambda token: token.rpartition(".")[0],                                      # missing segment
+    lambda token: "not a token",
+    lambda token: "",
+])
+def test_hmac_rejects_malformed_tokens(mangle):
+    backend = HmacBackend(SECRET, "HS256")
+    with pytest.raises(TokenError):
+        backend.decode(mangle(backend.encode({"sub": "member@example.com"})))
+
+
+def test_hmac_rejects_other_key():
+    token = HmacBackend("other-secret", "HS256").encode({"sub": "member@example.com"})
+    with pytest.raises(TokenError):
+        HmacBackend(SECRET, "HS256").decode(token)
+
+
+def test_hmac_rejects_expired_and_not_yet_valid():
+    backend = HmacBackend(SECRET, "HS256")
+    with pytest.raises(TokenError):
+        backend.decode(backend.encode({"exp": int(time.time()) - 1}))
+    with pytest.raises(TokenError):
+        backend.decode(backend.encode({"nbf": int(time.time()) + 60}))
+    with pytest.raises(TokenError):
+        backend.decode(backend.encode({"exp": "tomorrow"}))
+
+#-----------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("issuer, verifier", [
+    (HmacBackend, JoseBackend),
+    (JoseBackend, HmacBackend),
+    (HmacBackend, PyJWTBackend),
+    (PyJWTBackend, HmacBackend),
+])
+def test_backends_interoperate(issuer, verifier):
+    claims = {"sub": "member@example.com", "iat": 1700000000, "exp": int(time.time()) + 60}
+    token = issuer(SECRET, "HS256").encode(claims)
+    assert verifier(SECRET, "HS256").decode(token) == claims
+
+
+def test_token_service_converts_datetimes():
+    from datetime import datetime, timedelta, timezone
+    service = TokenService("hmac", SECRET, "HS256")
+    expire = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(minutes=5)
+    assert service.decode(service.encode({"sub": "m", "exp": expire}))["exp"] == int(expire.timestamp())
+
+
+def test_token_service_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        TokenService("nope", SECRET, "HS256")
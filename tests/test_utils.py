@@ -0,0 +1,159 @@
+# tests/test_utils.py
+# Unit tests for the pure helpers in app/utils (no database needed):
+# pagination cursors, the school prefix index, the Bloom filter, LRUCache generations and ETag matching.
+
+from datetime import datetime
+import pytest
+from starlette.requests import Request
+from app.utils.bloom import BloomFilter
+from app.utils.cache import LRUCache
+from sqlalchemy import column
+from sqlalchemy.dialects import postgresql
+from app.utils.cursor import decode_cursor, encode_cursor, seek_before
+from app.utils.http_cache import etag_matches
+from app.utils.prefix_index import PrefixIndex
+
+#-----------------------------------------------------------------------------------
+
+def test_cursor_round_trip():
+    sort_date = datetime(2024, 5, 17, 13, 45, 12, 123456)
+    assert decode_cursor(encode_cursor(sort_date, 42)) == (sort_date, 42)
+
+
+def test_cursor_is_url_safe():
+    assert all(c.isalnum() or c in "-_" for c in encode_cursor(datetime(2024, 1, 1), 2 ** 40))
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "bnVsbA", "WzEsMiwzXQ"])   # bnVsbA = null, WzEsMiwzXQ = [1,2,3]
+def test_cursor_rejects_garbage(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_cursor_on_a_row_without_date():
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+
+def test_seek_before_sorts_null_dates_as_oldest():
+    # both sides go through coalesce, so a NULL cursor date compares as -infinity instead of NULL
+    sql = str(seek_before(column("post_date"), column("post_id"), (None, 7)).compile(dialect=postgresql.dialect()))
+    assert sql.count("coalesce(") == 2 and "'-infinity'::timestamp" in sql
+
+#-----------------------------------------------------------------------------------
+
+def build_school_index():
+    names = ["Lincoln High", "Abraham Lincoln High", "lakeside Academy", "Linden Prep", "Oak Park"]
+    return PrefixIndex([(name, name) for name in names])
+
+
+def test_prefix_index_all_in_name_order():
+    assert build_school_index().all() == ["Abraham Lincoln High", "lakeside Academy", "Lincoln High", "Linden Prep", "Oak Park"]
+
+
+def test_prefix_index_leading_matches_before_later_words():
+    assert build_school_index().search("lin", 10) == ["Lincoln High", "Linden Prep", "Abraham Lincoln High"]
+
+
+def test_prefix_index_is_case_insensitive_and_limited():
+    index = build_school_index()
+    assert index.search("  LAKE", 10) == ["lakeside Academy"]
+    assert index.search("lin", 1) == ["Lincoln High"]
+    assert index.search("", 2) == ["Abraham Lincoln High", "lakeside Academy"]
+    assert index.search("zzz", 10) == []
+
+
+def test_prefix_index_lists_a_name_once():
+    index = PrefixIndex([("High High", 1)])
+    assert index.search("high", 10) == [1]
+
+#-----------------------------------------------------------------------------------
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    items = [f"member{i}@example.com" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(bloom.might_contain(item) for item in items)
+    assert not bloom.is_full()
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"member{i}@example.com")
+    false_positives = sum(bloom.might_contain(f"other{i}@example.com") for i in range(10000))
+    assert false_positives < 300   # 1% expected, 3% leaves room for the hash spread
+
+
+def test_bloom_filter_full_past_capacity():
+    bloom = BloomFilter(2, 0.01)
+    for item in ["a", "b", "c"]:
+        bloom.add(item)
+    assert bloom.is_full()
+
+#-----------------------------------------------------------------------------------
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_lru_cache_skips_fill_that_raced_with_pop():
+    cache = LRUCache(maxsize=10)
+    generation = cache.generation()
+    cache.pop("a")   # invalidated while the value was being loaded
+    assert cache.set("a", "stale", generation=generation) is False
+    assert cache.get("a") is None
+    assert cache.set("a", "fresh", generation=cache.generation()) is True
+    assert cache.get("a") == "fresh"
+
+
+def test_lru_cache_pop_of_another_key_keeps_fill():
+    cache = LRUCache(maxsize=10)
+    generation = cache.generation()
+    cache.pop("b")
+    assert cache.set("a", 1, generation=generation) is True
+
+
+def test_lru_cache_skips_fills_started_before_clear():
+    cache = LRUCache(maxsize=10)
+    generation = cache.generation()
+    cache.clear()
+    assert cache.set("a", 1, generation=generation) is False
+
+
+def test_lru_cache_skips_fill_when_pop_was_forgotten():
+    # pops beyond maxsize are forgotten, fills older than them are dropped to stay safe
+    cache = LRUCache(maxsize=1)
+    generation = cache.generation()
+    cache.pop("a")
+    cache.pop("b")
+    assert cache.set("a", 1, generation=generation) is False
+
+
+def test_lru_cache_entries_expire():
+    cache = LRUCache(maxsize=10)
+    cache.set("a", 1, ttl=-1)
+    assert cache.get("a", "missing") == "missing"
+
+#-----------------------------------------------------------------------------------
+
+def request_with(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ('"abc"', True),
+    ('"other"', False),
+    ('"other", "abc"', True),
+    ('W/"abc"', True),
+    ("*", True),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(request_with(header), '"abc"') is matches